@@ -36,9 +36,15 @@ v2 新增：
     ], mode="drawer", size="large")
 """
 
-import requests
+import json
 import random
 import string
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE = "http://localhost:14000"
 
@@ -72,8 +78,27 @@ EDIT_MAP = {
 }
 
 
+# base URL -> whether flowModels:update confirms the bulk {"items": [...]} form;
+# probed once per process by NB.bulk_update
+_bulk_update_supported = {}
+
+_UID_CHARS = string.ascii_lowercase + string.digits
+_uid_pool = []
+
+
 def uid():
-    return ''.join(random.choices(string.ascii_lowercase + string.digits, k=11))
+    """11-char lowercase alphanumeric UID, drawn from a pool refilled by uid_batch(256)."""
+    try:
+        return _uid_pool.pop()
+    except IndexError:
+        _uid_pool.extend(uid_batch(256))
+        return _uid_pool.pop()
+
+
+def uid_batch(n):
+    """Generate n UIDs with a single random draw (same format as uid())."""
+    raw = ''.join(random.choices(_UID_CHARS, k=11 * n))
+    return [raw[i:i + 11] for i in range(0, 11 * n, 11)]
 
 
 def _deep_merge(base, patch):
@@ -85,6 +110,46 @@ def _deep_merge(base, patch):
             base[k] = v
 
 
+def _btn(title, type_="default", icon=None):
+    """Build buttonSettings stepParams for an action button (icon optional)."""
+    general = {"title": title, "type": type_}
+    if icon:
+        general["icon"] = icon
+    return {"buttonSettings": {"general": general}}
+
+
+# filter_form() 默认字段（field="name" 的 input/string）预构建
+_NAME_FILTER_FIELD = {"name": "name", "title": "Name", "interface": "input", "type": "string"}
+
+
+# ── outline() JS 模板（静态部分，仅 info JSON 与 title 按调用拼接）──────────
+
+_OUTLINE_JS_HEAD = "const h = ctx.React.createElement;\nconst info = "
+_OUTLINE_JS_BODY = (
+    ";\n"
+    "const entries = Object.entries(info);\n"
+    "const tk = ctx.themeToken || {};\n"
+    "ctx.render(h('div', {style: {"
+    "padding: 10, borderRadius: 6, fontSize: 12, lineHeight: '20px', "
+    "background: tk.colorBgLayout || '#f5f5f5', "
+    "border: '1px dashed ' + (tk.colorBorder || '#d9d9d9')"
+    "}},\n"
+    "  h('div', {style: {fontWeight: 600, fontSize: 13, marginBottom: 4, "
+    "color: tk.colorPrimary || '#1890ff'}}, "
+    "'\U0001f4cb "  # 📋
+)
+_OUTLINE_JS_TAIL = (
+    "'),\n"
+    "  ...entries.map(([k,v]) => h('div', {key: k, style: {"
+    "color: tk.colorTextSecondary || '#888'}},\n"
+    "    h('span', {style: {fontWeight: 500, color: tk.colorText || '#333', "
+    "marginRight: 4}}, k + ':'),\n"
+    "    h('span', null, typeof v === 'object' ? JSON.stringify(v) : String(v))\n"
+    "  ))\n"
+    "));"
+)
+
+
 # ── Fields 格式解析（多列+分组）──────────────────────────────────
 
 def _parse_field_name(name):
@@ -171,10 +236,24 @@ def _normalize_fields(fields):
 class NB:
     """NocoBase FlowPage builder v2 — 极简 API，自动推断一切。"""
 
+    # _all_models_cache / _filter_mappings 按需设置（hasattr/getattr 判断）
+    __slots__ = ("base", "s", "account", "created", "errors",
+                 "_field_cache", "_title_cache", "_sort_counters",
+                 "_all_models_cache", "_filter_mappings")
+
     def __init__(self, base_url=None, auto_login=True):
         self.base = base_url or BASE
+        self.account = None  # set by login()
         self.s = requests.Session()
         self.s.trust_env = False
+        # 连接池：线程并发请求（PageTool.prefetch 等）复用 keep-alive 连接
+        # 网关抖动（502/503/504）自动重试；POST 不在 Retry 默认方法内，不会重复提交
+        retry = Retry(total=2, backoff_factor=0.1, status_forcelist=(502, 503, 504),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        self.s.mount("http://", adapter)
+        self.s.mount("https://", adapter)
+        self.s.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
         self.created = 0
         self.errors = []
         self._field_cache = {}
@@ -187,6 +266,7 @@ class NB:
         r = self.s.post(f"{self.base}/api/auth:signIn",
                         json={"account": account, "password": password})
         self.s.headers.update({"Authorization": f"Bearer {r.json()['data']['token']}"})
+        self.account = account
         return self
 
     # ── Metadata ────────────────────────────────────────────────
@@ -218,12 +298,17 @@ class NB:
         self._load_meta(target_coll)
         return self._title_cache.get(target_coll, "name")
 
-    def _next_sort(self, parent):
-        """Auto-increment sort index per parent. Resets on new page_layout()."""
-        self._sort_counters.setdefault(parent, 0)
-        s = self._sort_counters[parent]
-        self._sort_counters[parent] += 1
-        return s
+    def _next_sort(self, parent, sort=None):
+        """Auto-increment sort index per parent. Resets on new page_layout().
+
+        An explicit sort is returned as-is but still advances the counter, so
+        later auto-sorted siblings never collide with it.
+        """
+        n = self._sort_counters.get(parent, 0)
+        if sort is None:
+            sort = n
+        self._sort_counters[parent] = max(n, sort + 1)
+        return sort
 
     # ── Low-level API ───────────────────────────────────────────
 
@@ -239,6 +324,29 @@ class NB:
             self.errors.append(f"{use}({u}): {r.text[:100]}")
         return u
 
+    def _save_many(self, parent, sub_key, sub_type, *specs):
+        """Save several sibling models under one parent. Returns list of UIDs.
+
+        specs: (use, sp, sort) tuples, e.g.
+            self._save_many(tbl, "actions", "array",
+                ("FilterActionModel", {}, 1),
+                ("RefreshActionModel", {}, 2))
+        """
+        return [self.save(use, parent, sub_key, sub_type, sp, sort)
+                for use, sp, sort in specs]
+
+    def _standard_table_actions(self, tbl, coll, mode="drawer", size="large", with_filter=True):
+        """Create the Filter / Refresh / AddNew action bar of a table. Returns AddNew UID."""
+        specs = [("FilterActionModel", {}, 1)] if with_filter else []
+        specs += [
+            ("RefreshActionModel", {}, 2),
+            ("AddNewActionModel", {
+                "popupSettings": {"openView": {"collectionName": coll, "dataSourceKey": "main",
+                                               "mode": mode, "size": size,
+                                               "pageModelClass": "ChildPageModel"}}}, 3),
+        ]
+        return self._save_many(tbl, "actions", "array", *specs)[-1]
+
     def update(self, u, patch):
         """Update existing FlowModel via flowModels:update (merge, not replace).
 
@@ -257,6 +365,66 @@ class NB:
                          json={"options": opts})
         return r2.ok
 
+    def bulk_update(self, items):
+        """Apply several patches, each GET → deep merge → update like update().
+
+        items: [(uid, patch)]. Every model is fetched fresh and merged, then all
+        go out in one flowModels:update request. That result is only trusted
+        when the response confirms every item; otherwise each merged model is
+        sent with update?filterByTk=uid (no second GET). Whether the server
+        confirms the bulk form is remembered per base URL, so unsupported
+        servers are only asked once per process. Returns [ok, ...] in item order.
+        """
+        if not items:
+            return []
+
+        def _get(u):
+            try:
+                r = self.s.get(f"{self.base}/api/flowModels:get?filterByTk={u}")
+                return r.json().get("data") if r.ok else None
+            except (requests.RequestException, ValueError):
+                return None
+
+        workers = min(8, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            models = list(ex.map(_get, [u for u, _ in items]))
+        merged = []
+        for (u, patch), data in zip(items, models):
+            opts = None
+            if data:
+                opts = {k: v for k, v in data.items() if k not in ("uid", "name")}
+                _deep_merge(opts, patch)
+            merged.append((u, opts))
+
+        if all(models) and _bulk_update_supported.get(self.base) is not False:
+            r = self.s.post(f"{self.base}/api/flowModels:update", json={
+                "items": [{"filterByTk": u, "options": opts} for u, opts in merged]})
+            try:
+                done = r.json().get("data") if r.ok else None
+            except ValueError:
+                done = None
+            confirmed = isinstance(done, list) and len(done) == len(items) and all(done)
+            if confirmed or r.status_code < 500:
+                # 5xx says nothing about the bulk form: ask again next time
+                _bulk_update_supported[self.base] = confirmed
+            if confirmed:
+                return [True] * len(items)
+
+        def _put(item):
+            u, opts = item
+            if opts is None:
+                return False
+            try:
+                r = self.s.post(f"{self.base}/api/flowModels:update?filterByTk={u}",
+                                json={"options": opts})
+                return r.ok
+            except requests.RequestException:
+                return False
+
+        # 逐条回退：复用上面已合并的 options，并发发送，单条失败不影响其余
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(_put, merged))
+
     def destroy(self, u):
         """Delete a single FlowModel node."""
         self.s.post(f"{self.base}/api/flowModels:destroy?filterByTk={u}")
@@ -270,6 +438,29 @@ class NB:
         print(f"  🗑️  Destroyed {len(to_delete)} nodes (root: {u})")
         self._invalidate_cache()
 
+    def destroy_cascade(self, u):
+        """Delete a node and its subtree in one server-side cascade request.
+
+        Falls back to destroy_tree() (client-side, leaf-first) if the server
+        rejects the cascade flag, or ignores it and leaves children behind.
+        """
+        r = self.s.post(f"{self.base}/api/flowModels:destroy?filterByTk={u}&cascade=true")
+        if not r.ok or self._has_children(u):
+            self._invalidate_cache()
+            self.destroy_tree(u)
+            return
+        print(f"  🗑️  Destroyed {u} (cascade)")
+        self._invalidate_cache()
+
+    def _has_children(self, u):
+        """True if any FlowModel still has parentId == u (or the check fails)."""
+        try:
+            r = self.s.get(f"{self.base}/api/flowModels:list",
+                           params={"filter[parentId]": u, "paginate": "false"})
+            return not r.ok or bool(r.json().get("data"))
+        except (requests.RequestException, ValueError):
+            return True
+
     def _list_all(self):
         """Fetch all FlowModels (cached per session)."""
         if not hasattr(self, '_all_models_cache'):
@@ -291,9 +482,9 @@ class NB:
             if pid:
                 children_map.setdefault(pid, []).append(m["uid"])
         result = []
-        queue = list(children_map.get(root_uid, []))
+        queue = deque(children_map.get(root_uid, ()))
         while queue:
-            uid_ = queue.pop(0)
+            uid_ = queue.popleft()
             result.append(uid_)
             queue.extend(children_map.get(uid_, []))
         return result
@@ -510,6 +701,23 @@ class NB:
 
     # ── 弹窗内多区块构建 ───────────────────────────────────────
 
+    def _child_page(self, parent, tabs):
+        """ChildPageModel + 每个 tab 一组 ChildPageTabModel → BlockGridModel。
+
+        单 tab 弹窗也保留 ChildPageTabModel：ChildPageModel 只通过 tabs 子模型
+        渲染内容，enableTabs=False 仅隐藏标签栏。
+        Returns (child_page_uid, [block_grid_uid, ...])，与 tabs 一一对应。
+        """
+        cp = self.save("ChildPageModel", parent, "page", "object",
+                       {"pageSettings": {"general": {"displayTitle": False,
+                                                     "enableTabs": len(tabs) > 1}}})
+        grids = []
+        for ti, tab in enumerate(tabs):
+            ct = self.save("ChildPageTabModel", cp, "tabs", "array",
+                           {"pageTabSettings": {"tab": {"title": tab["title"]}}}, ti)
+            grids.append(self.save("BlockGridModel", ct, "grid", "object"))
+        return cp, grids
+
     def _build_tab_blocks(self, bg, coll, tab):
         """在一个 BlockGridModel 内构建多个区块（details/js/sub_table）。"""
         blocks = tab.get("blocks")
@@ -690,11 +898,7 @@ class NB:
         tbl = self.save("TableBlockModel", grid, "items", "array", {
             "resourceSettings": {"init": {"dataSourceKey": "main", "collectionName": coll}},
             "tableSettings": {"defaultSorting": {"sort": [{"field": "createdAt", "direction": "desc"}]}}})
-        self.save("FilterActionModel", tbl, "actions", "array", {}, 1)
-        self.save("RefreshActionModel", tbl, "actions", "array", {}, 2)
-        addnew = self.save("AddNewActionModel", tbl, "actions", "array", {
-            "popupSettings": {"openView": {"collectionName": coll, "dataSourceKey": "main",
-                                           "mode": "drawer", "size": "large", "pageModelClass": "ChildPageModel"}}}, 3)
+        addnew = self._standard_table_actions(tbl, coll)
         for i, f in enumerate(fields):
             self.col(tbl, coll, f, i + 1, click=(first_click and i == 0))
         actcol = self.save("TableActionsColumnModel", tbl, "columns", "array", {
@@ -711,24 +915,17 @@ class NB:
         Use with page_layout() for multi-block pages.
         link_actions: [{"title": "Reports", "icon": "barChartOutlined"}]
         """
-        if sort is None:
-            sort = self._next_sort(parent)
+        sort = self._next_sort(parent, sort)
         sp = {"resourceSettings": {"init": {"dataSourceKey": "main", "collectionName": coll}},
               "tableSettings": {"defaultSorting": {"sort": [{"field": "createdAt", "direction": "desc"}]}}}
         if title:
             sp["cardSettings"] = {"titleDescription": {"title": title}}
         tbl = self.save("TableBlockModel", parent, "items", "array", sp, sort)
-        self.save("FilterActionModel", tbl, "actions", "array", {}, 1)
-        self.save("RefreshActionModel", tbl, "actions", "array", {}, 2)
-        addnew = self.save("AddNewActionModel", tbl, "actions", "array", {
-            "popupSettings": {"openView": {"collectionName": coll, "dataSourceKey": "main",
-                                           "mode": "drawer", "size": "large", "pageModelClass": "ChildPageModel"}}}, 3)
+        addnew = self._standard_table_actions(tbl, coll)
         if link_actions:
             for li, la in enumerate(link_actions):
-                self.save("LinkActionModel", tbl, "actions", "array", {
-                    "buttonSettings": {"general": {"title": la["title"], "type": "default",
-                                                    **({"icon": la.get("icon")} if la.get("icon") else {})}}
-                }, 4 + li)
+                self.save("LinkActionModel", tbl, "actions", "array",
+                          _btn(la["title"], icon=la.get("icon")), 4 + li)
         for i, f in enumerate(fields):
             self.col(tbl, coll, f, i + 1, click=(first_click and i == 0))
         actcol = self.save("TableActionsColumnModel", tbl, "columns", "array", {
@@ -755,8 +952,7 @@ class NB:
         Returns (filter_block_uid, filter_item_uid).
         The filter_item_uid is used internally by set_layout() to write filterManager.
         """
-        if sort is None:
-            sort = self._next_sort(parent)
+        sort = self._next_sort(parent, sort)
         fb = self.save("FilterFormBlockModel", parent, "items", "array", {
             "formFilterBlockModelSettings": {"layout": {
                 "layout": "horizontal", "labelAlign": "left",
@@ -765,19 +961,21 @@ class NB:
         fg = self.save("FilterFormGridModel", fb, "grid", "object")
         self._load_meta(coll)
         field_meta = self._field_cache.get(coll, {}).get(field, {})
+        iface = field_meta.get("interface", "input")
+        ftype = field_meta.get("type", "string")
+        if field == "name" and iface == "input" and ftype == "string":
+            filter_field = dict(_NAME_FILTER_FIELD)
+        else:
+            filter_field = {"name": field, "title": field.replace("_", " ").title(),
+                            "interface": iface, "type": ftype}
+        fi_init = {"filterField": filter_field}
+        if target_uid:
+            fi_init["defaultTargetUid"] = target_uid
         fi_sp = {
             "fieldSettings": {"init": {"dataSourceKey": "main",
                                        "collectionName": coll, "fieldPath": field}},
             "filterFormItemSettings": {
-                "init": {
-                    "filterField": {
-                        "name": field,
-                        "title": field.replace("_", " ").title(),
-                        "interface": field_meta.get("interface", "input"),
-                        "type": field_meta.get("type", "string"),
-                    },
-                    **({"defaultTargetUid": target_uid} if target_uid else {}),
-                },
+                "init": fi_init,
                 "showLabel": {"showLabel": True},
                 "label": {"label": label},
             },
@@ -805,34 +1003,24 @@ class NB:
         Returns panel_uid.
         """
         panel = self.save("ActionPanelBlockModel", parent, "items", "array", {}, sort)
+        popup_uids = uid_batch(sum(1 for a in actions if a["type"] == "popup"))
         for i, act in enumerate(actions):
             if act["type"] == "link":
-                self.save("LinkActionModel", panel, "actions", "array", {
-                    "buttonSettings": {"general": {"title": act["title"], "type": "default",
-                                                    **({"icon": act.get("icon")} if act.get("icon") else {})}}
-                }, i)
+                self.save("LinkActionModel", panel, "actions", "array",
+                          _btn(act["title"], icon=act.get("icon")), i)
             elif act["type"] == "popup":
-                pu = uid()
-                self.save("PopupActionModel", panel, "actions", "array", {
-                    "popupSettings": {"openView": {
-                        "collectionName": act.get("coll", ""),
-                        "dataSourceKey": "main",
-                        "mode": act.get("mode", "drawer"),
-                        "size": act.get("size", "large"),
-                        "pageModelClass": "ChildPageModel", "uid": pu}},
-                    "buttonSettings": {"general": {"title": act["title"],
-                                                    "type": act.get("btn_type", "primary"),
-                                                    **({"icon": act.get("icon")} if act.get("icon") else {})}}
-                }, i, pu)
+                pu = popup_uids.pop()
+                sp = _btn(act["title"], act.get("btn_type", "primary"), act.get("icon"))
+                sp["popupSettings"] = {"openView": {
+                    "collectionName": act.get("coll", ""),
+                    "dataSourceKey": "main",
+                    "mode": act.get("mode", "drawer"),
+                    "size": act.get("size", "large"),
+                    "pageModelClass": "ChildPageModel", "uid": pu}}
+                self.save("PopupActionModel", panel, "actions", "array", sp, i, pu)
                 if act.get("tabs"):
-                    tabs = act["tabs"]
-                    enable = len(tabs) > 1
-                    cp = self.save("ChildPageModel", pu, "page", "object",
-                                   {"pageSettings": {"general": {"displayTitle": False, "enableTabs": enable}}})
-                    for ti, tab in enumerate(tabs):
-                        ct = self.save("ChildPageTabModel", cp, "tabs", "array",
-                                       {"pageTabSettings": {"tab": {"title": tab["title"]}}}, ti)
-                        bg = self.save("BlockGridModel", ct, "grid", "object")
+                    _, grids = self._child_page(pu, act["tabs"])
+                    for bg, tab in zip(grids, act["tabs"]):
                         self._build_tab_blocks(bg, act.get("coll", ""), tab)
         return panel
 
@@ -879,10 +1067,8 @@ class NB:
                                           "associationName": f"{parent_coll}.{assoc}",
                                           "sourceId": "{{ctx.view.inputArgs.filterByTk}}"}},
             **({"cardSettings": {"titleDescription": {"title": title}}} if title else {})})
-        self.save("RefreshActionModel", tbl, "actions", "array", {}, 2)
-        addnew = self.save("AddNewActionModel", tbl, "actions", "array", {
-            "popupSettings": {"openView": {"collectionName": target_coll, "dataSourceKey": "main",
-                                           "mode": "dialog", "size": "small", "pageModelClass": "ChildPageModel"}}}, 3)
+        addnew = self._standard_table_actions(tbl, target_coll, mode="dialog", size="small",
+                                              with_filter=False)
         for i, f in enumerate(fields):
             self.col(tbl, target_coll, f, i + 1)
         self.save("TableActionsColumnModel", tbl, "columns", "array", {
@@ -961,13 +1147,8 @@ class NB:
             "collectionName": coll, "dataSourceKey": "main",
             "mode": mode, "size": size,
             "pageModelClass": "ChildPageModel", "uid": parent_uid}}}})
-        enable_tabs = len(tabs) > 1
-        cp = self.save("ChildPageModel", parent_uid, "page", "object",
-                       {"pageSettings": {"general": {"displayTitle": False, "enableTabs": enable_tabs}}})
-        for ti, tab in enumerate(tabs):
-            ct = self.save("ChildPageTabModel", cp, "tabs", "array",
-                           {"pageTabSettings": {"tab": {"title": tab["title"]}}}, ti)
-            bg = self.save("BlockGridModel", ct, "grid", "object")
+        cp, grids = self._child_page(parent_uid, tabs)
+        for bg, tab in zip(grids, tabs):
             self._build_tab_blocks(bg, coll, tab)
         return cp
 
@@ -975,22 +1156,14 @@ class NB:
                      icon=None, btn_type="link", sort=1):
         """Create PopupCollectionActionModel with custom content."""
         au = uid()
-        sp = {
-            "popupSettings": {"openView": {
-                "collectionName": coll, "dataSourceKey": "main",
-                "mode": mode, "size": size, "pageModelClass": "ChildPageModel",
-                "uid": au, "filterByTk": "{{ ctx.record.id }}"}},
-            "buttonSettings": {"general": {"type": btn_type, "title": title,
-                                           **({"icon": icon} if icon else {})}},
-        }
+        sp = _btn(title, btn_type, icon)
+        sp["popupSettings"] = {"openView": {
+            "collectionName": coll, "dataSourceKey": "main",
+            "mode": mode, "size": size, "pageModelClass": "ChildPageModel",
+            "uid": au, "filterByTk": "{{ ctx.record.id }}"}}
         self.save("PopupCollectionActionModel", actcol, "actions", "array", sp, sort, au)
-        enable_tabs = len(tabs) > 1
-        cp = self.save("ChildPageModel", au, "page", "object",
-                       {"pageSettings": {"general": {"displayTitle": False, "enableTabs": enable_tabs}}})
-        for ti, tab in enumerate(tabs):
-            ct = self.save("ChildPageTabModel", cp, "tabs", "array",
-                           {"pageTabSettings": {"tab": {"title": tab["title"]}}}, ti)
-            bg = self.save("BlockGridModel", ct, "grid", "object")
+        cp, grids = self._child_page(au, tabs)
+        for bg, tab in zip(grids, tabs):
             if tab.get("form"):
                 fm = self.save("EditFormModel", bg, "items", "array", {
                     "resourceSettings": {"init": {"dataSourceKey": "main", "collectionName": coll,
@@ -1009,11 +1182,7 @@ class NB:
         tbl = self.save("TableBlockModel", bg, "items", "array", {
             "resourceSettings": {"init": {"dataSourceKey": "main", "collectionName": coll}},
             "cardSettings": {"titleDescription": {"title": title}}})
-        self.save("FilterActionModel", tbl, "actions", "array", {}, 1)
-        self.save("RefreshActionModel", tbl, "actions", "array", {}, 2)
-        an = self.save("AddNewActionModel", tbl, "actions", "array", {
-            "popupSettings": {"openView": {"collectionName": coll, "dataSourceKey": "main",
-                                           "mode": "dialog", "size": "small", "pageModelClass": "ChildPageModel"}}}, 3)
+        an = self._standard_table_actions(tbl, coll, mode="dialog", size="small")
         for i, f in enumerate(fields):
             self.col(tbl, coll, f, i + 1)
         self.addnew_form(an, coll, fields, required=[fields[0]] if fields else [])
@@ -1023,8 +1192,7 @@ class NB:
 
     def js_block(self, parent_grid, title, code, sort=None):
         """Create page-level JSBlockModel."""
-        if sort is None:
-            sort = self._next_sort(parent_grid)
+        sort = self._next_sort(parent_grid, sort)
         sp = {"jsSettings": {"runJs": {"version": "v1", "code": code}},
               "cardSettings": {"titleDescription": {"title": title}}}
         return self.save("JSBlockModel", parent_grid, "items", "array", sp, sort)
@@ -1055,7 +1223,6 @@ class NB:
         """
         filter_js = ""
         if filter_:
-            import json
             filter_js = f", filter: {json.dumps(filter_)}"
         color_js = f", color:'{color}'" if color else ""
         code = f"""(async () => {{
@@ -1121,7 +1288,6 @@ class NB:
             nb.quick_filter(grid, "nb_pm_projects", "status",
                 ["All", "Active", "Completed", "Blocked"], tbl)
         """
-        import json
         labels_js = json.dumps(labels)
         code = f"""const targetUid = '{target_uid}';
 const field = '{field}';
@@ -1172,13 +1338,18 @@ ctx.render(ctx.React.createElement(Space, {{ wrap: true }},
         """Find the DisplayFieldModel UID of a click-to-open column in a table.
         Returns UID or None."""
         r = self.s.get(f"{self.base}/api/flowModels:list?paginate=false")
-        items = r.json().get("data", [])
-        for it in items:
-            if it.get("parentId") == tbl_uid and it.get("use") == "TableColumnModel":
-                fp = it.get("stepParams", {}).get("fieldSettings", {}).get("init", {}).get("fieldPath")
+        by_parent = {}
+        for it in r.json().get("data", []):
+            by_parent.setdefault(it.get("parentId"), []).append(it)
+        for it in by_parent.get(tbl_uid, ()):
+            if it.get("use") == "TableColumnModel":
+                try:
+                    fp = it["stepParams"]["fieldSettings"]["init"]["fieldPath"]
+                except (KeyError, TypeError):
+                    continue
                 if fp == field_name:
-                    for ch in items:
-                        if ch.get("parentId") == it["uid"] and "Display" in (ch.get("use") or ""):
+                    for ch in by_parent.get(it["uid"], ()):
+                        if "Display" in (ch.get("use") or ""):
                             return ch["uid"]
         return None
 
@@ -1243,33 +1414,11 @@ ctx.render(ctx.React.createElement(Space, {{ wrap: true }},
                 "formula": "quantity * unit_price",
             }, kind="item")
         """
-        import json as _json
         u = uid()
         ctx_info_with_uid = {"uid": u, **ctx_info}
-        info_json = _json.dumps(ctx_info_with_uid, ensure_ascii=False, indent=2)
-
-        icon = "\U0001f4cb"  # 📋
-        code = (
-            "const h = ctx.React.createElement;\n"
-            f"const info = {info_json};\n"
-            "const entries = Object.entries(info);\n"
-            "const tk = ctx.themeToken || {};\n"
-            "ctx.render(h('div', {style: {"
-            "padding: 10, borderRadius: 6, fontSize: 12, lineHeight: '20px', "
-            "background: tk.colorBgLayout || '#f5f5f5', "
-            "border: '1px dashed ' + (tk.colorBorder || '#d9d9d9')"
-            "}},\n"
-            "  h('div', {style: {fontWeight: 600, fontSize: 13, marginBottom: 4, "
-            "color: tk.colorPrimary || '#1890ff'}}, "
-            f"'{icon} {title}'),\n"
-            "  ...entries.map(([k,v]) => h('div', {key: k, style: {"
-            "color: tk.colorTextSecondary || '#888'}},\n"
-            "    h('span', {style: {fontWeight: 500, color: tk.colorText || '#333', "
-            "marginRight: 4}}, k + ':'),\n"
-            "    h('span', null, typeof v === 'object' ? JSON.stringify(v) : String(v))\n"
-            "  ))\n"
-            "));"
-        )
+        info_json = json.dumps(ctx_info_with_uid, ensure_ascii=False, indent=2)
+
+        code = _OUTLINE_JS_HEAD + info_json + _OUTLINE_JS_BODY + title + _OUTLINE_JS_TAIL
 
         if kind == "column":
             return self.js_column(parent, title, code, sort or 50, width=120)
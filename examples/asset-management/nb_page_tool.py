@@ -20,78 +20,199 @@
     pt.patch_field(uid, description="帮助文本", defaultValue="默认值")
 """
 
-import sys, json, argparse
+import sys, os, json, argparse, hashlib, tempfile
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from nb_page_builder import NB, _deep_merge, uid, EDIT_MAP, DISPLAY_MAP
 
+try:
+    import ijson  # 可选：流式解析 flowModels:list
+except ImportError:
+    ijson = None
+
+try:
+    from orjson import loads as _json_loads  # 可选：CLI --prop 值解析
+except ImportError:
+    _json_loads = json.loads
+
+_INFO_CACHE_SIZE = 512
+_HTTP_CACHE_DIR = os.path.expanduser("~/.cache/nb_page_tool")
+
+# locate(block=...) 简写 → Model use
+_BLOCK_MAP = {
+    "table": "TableBlockModel",
+    "addnew": "AddNewActionModel",
+    "edit": "EditActionModel",
+    "filter": "FilterFormModel",
+    "details": "DetailsBlockModel",
+    "form_create": "CreateFormModel",
+    "form_edit": "EditFormModel",
+}
+
 
 class PageTool:
     """FlowModel 局部 CRUD 工具。"""
 
-    def __init__(self, base_url=None):
+    def __init__(self, base_url=None, eager=False):
+        """eager=True: 构造时并发预取 models + routes（show/locate 等两者都要用）。"""
         self.nb = NB(base_url)
         self._models = None
+        self._by_uid = None     # uid → model
+        self._children = None   # parentId → [model]（按 sortIndex 排序）
+        self._tree_cache = {}   # tab_uid → tree
+        self._match_index = {}  # tab_uid → {(use, field_path): [(uid, use, field_path)]}
         self._routes = None
+        self._tab_by_title = None  # flowPage title → tab UID
+        self._info_cache = OrderedDict()  # uid → flowModels:get data (LRU)
+        if eager:
+            self.prefetch()
 
     # ── 数据获取 ──────────────────────────────────────────────
 
+    def prefetch(self):
+        """并发拉取 flowModels + desktopRoutes，两个请求的网络等待重叠。"""
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fm = ex.submit(self._load_models)
+            fr = ex.submit(self._load_routes)
+            fm.result()
+            fr.result()
+
     def _load_models(self, force=False):
         if self._models and not force:
             return self._models
-        r = self.nb.s.get(f"{self.nb.base}/api/flowModels:list?paginate=false")
-        self._models = r.json().get("data", [])
+        cached = self._read_http_cache("models")
+        r = self.nb.s.get(f"{self.nb.base}/api/flowModels:list?paginate=false",
+                          stream=ijson is not None, headers=self._etag_headers(cached))
+        if r.status_code == 304 and cached:
+            self._models = cached["data"]
+        else:
+            if ijson is not None and r.ok:
+                # 流式解析 data 数组，不在内存中保留整段响应文本
+                r.raw.decode_content = True
+                self._models = list(ijson.items(r.raw, "data.item", use_float=True))
+            else:
+                self._models = r.json().get("data", [])
+            self._write_http_cache("models", r, self._models)
+        self._by_uid = {m["uid"]: m for m in self._models}
+        self._children = {}
+        for m in self._models:
+            pid = m.get("parentId")
+            if pid:
+                self._children.setdefault(pid, []).append(m)
+        for siblings in self._children.values():
+            siblings.sort(key=lambda m: m.get("sortIndex", 0))
+        self._tree_cache.clear()
+        self._match_index.clear()
         return self._models
 
+    def _invalidate(self):
+        """Drop cached models + indexes (call after any mutation)."""
+        self._models = None
+        self._by_uid = None
+        self._children = None
+        self._tree_cache.clear()
+        self._match_index.clear()
+        self._info_cache.clear()
+        self._drop_http_cache("models")
+
     def _load_routes(self, force=False):
         if self._routes and not force:
             return self._routes
+        cached = self._read_http_cache("routes")
         r = self.nb.s.get(f"{self.nb.base}/api/desktopRoutes:list",
-                          params={"paginate": "false", "tree": "true"})
-        self._routes = r.json().get("data", [])
+                          params={"paginate": "false", "tree": "true"},
+                          headers=self._etag_headers(cached))
+        if r.status_code == 304 and cached:
+            self._routes = cached["data"]
+        else:
+            self._routes = r.json().get("data", [])
+            self._write_http_cache("routes", r, self._routes)
+        self._index_routes()
         return self._routes
 
+    # ── 磁盘 ETag 缓存：跨 CLI 调用复用 list 响应，304 时不重新下载 ──
+
+    def _http_cache_path(self, key):
+        # 按 服务器 + 账号 区分：不同账号看到的 list 结果不同，不能共用
+        tag = hashlib.md5(f"{self.nb.base}|{self.nb.account}".encode()).hexdigest()[:8]
+        return os.path.join(_HTTP_CACHE_DIR, f"{key}-{tag}.json")
+
+    def _read_http_cache(self, key):
+        try:
+            with open(self._http_cache_path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _etag_headers(cached):
+        return {"If-None-Match": cached["etag"]} if cached else {}
+
+    def _write_http_cache(self, key, r, data):
+        etag = r.headers.get("ETag")
+        if not (r.ok and etag):
+            return
+        # 内容是登录后才能看到的完整列表：目录 0700、文件 0600（mkstemp 创建后原子替换）
+        try:
+            os.makedirs(_HTTP_CACHE_DIR, mode=0o700, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=_HTTP_CACHE_DIR, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"etag": etag, "data": data}, f, ensure_ascii=False)
+            os.replace(tmp, self._http_cache_path(key))
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def _drop_http_cache(self, key):
+        try:
+            os.remove(self._http_cache_path(key))
+        except OSError:
+            pass
+
     def _children_map(self):
-        """Build parentId → [model] map."""
-        models = self._load_models()
-        cm = {}
-        for m in models:
-            pid = m.get("parentId")
-            if pid:
-                cm.setdefault(pid, []).append(m)
-        return cm
+        """parentId → [model] map (indexed and sorted by sortIndex once per model load)."""
+        self._load_models()
+        return self._children
 
     def _model_by_uid(self, uid_):
         """Find model by uid."""
-        for m in self._load_models():
-            if m["uid"] == uid_:
-                return m
-        return None
+        self._load_models()
+        return self._by_uid.get(uid_)
 
     # ── 路由 → Tab UID 解析 ───────────────────────────────────
 
     def _find_tab_uid(self, page_title):
         """从路由树中找到页面对应的 tab UID。"""
-        routes = self._load_routes()
-        for rt in routes:
-            found = self._search_route(rt, page_title)
-            if found:
-                return found
-        return None
-
-    def _search_route(self, route, title):
-        t = route.get("title") or ""
-        if t == title and route.get("type") == "flowPage":
-            children = route.get("children", [])
-            for c in children:
-                if c.get("type") == "tabs" and c.get("schemaUid"):
-                    return c["schemaUid"]
-            # Single tab (hidden) — title may be None
-            for c in children:
-                if c.get("schemaUid"):
-                    return c["schemaUid"]
-        for child in route.get("children", []):
-            found = self._search_route(child, title)
-            if found:
-                return found
+        self._load_routes()
+        return self._tab_by_title.get(page_title)
+
+    def _index_routes(self):
+        """遍历一次路由树，建立 title → tab UID 索引（同名页面取先序遍历第一个）。"""
+        self._tab_by_title = {}
+        stack = deque(reversed(self._routes))
+        while stack:
+            route = stack.pop()
+            children = route.get("children") or []
+            if route.get("type") == "flowPage":
+                tab_uid = self._route_tab_uid(children)
+                if tab_uid:
+                    self._tab_by_title.setdefault(route.get("title") or "", tab_uid)
+            stack.extend(reversed(children))
+
+    @staticmethod
+    def _route_tab_uid(children):
+        for c in children:
+            if c.get("type") == "tabs" and c.get("schemaUid"):
+                return c["schemaUid"]
+        # Single tab (hidden) — title may be None
+        for c in children:
+            if c.get("schemaUid"):
+                return c["schemaUid"]
         return None
 
     # ── 树构建 & 显示 ─────────────────────────────────────────
@@ -100,16 +221,51 @@ class PageTool:
         """从 parentId 关系构建子树。"""
         if cm is None:
             cm = self._children_map()
-        node = self._model_by_uid(root_uid) or {"uid": root_uid, "use": "?"}
-        children = sorted(cm.get(root_uid, []), key=lambda m: m.get("sortIndex", 0))
-        return {
-            "uid": node["uid"],
-            "use": node.get("use", "?"),
-            "subKey": node.get("subKey", ""),
-            "sortIndex": node.get("sortIndex", 0),
-            "stepParams": node.get("stepParams", {}),
-            "children": [self._build_tree(c["uid"], cm) for c in children],
-        }
+        root = None
+        stack = [(root_uid, None)]  # (uid, parent tree node)
+        while stack:
+            uid_, parent = stack.pop()
+            model = self._model_by_uid(uid_) or {"uid": uid_, "use": "?"}
+            sp = model.get("stepParams", {})
+            fs = sp.get("fieldSettings", {}).get("init", {})
+            node = {
+                "uid": model["uid"],
+                "use": model.get("use", "?"),
+                "subKey": model.get("subKey", ""),
+                "sortIndex": model.get("sortIndex", 0),
+                "stepParams": sp,
+                # 遍历时常用属性，构建时提取一次
+                "field_path": fs.get("fieldPath", ""),
+                "field_coll": fs.get("collectionName", ""),
+                "coll": sp.get("resourceSettings", {}).get("init", {}).get("collectionName", ""),
+                "title": sp.get("cardSettings", {}).get("titleDescription", {}).get("title", ""),
+                "col_title": sp.get("tableColumnSettings", {}).get("title", {}).get("title", ""),
+                "children": [],
+            }
+            if parent is None:
+                root = node
+            else:
+                parent["children"].append(node)
+            # cm 的子列表在 _load_models 中已按 sortIndex 排序
+            stack.extend((c["uid"], node) for c in reversed(cm.get(uid_, [])))
+        return root
+
+    @staticmethod
+    def _iter_tree(tree):
+        """先序遍历子树，yield (node, depth)。"""
+        stack = [(tree, 0)]
+        while stack:
+            node, depth = stack.pop()
+            yield node, depth
+            stack.extend((c, depth + 1) for c in reversed(node.get("children", [])))
+
+    def _page_tree(self, tab_uid):
+        """页面树（按 tab_uid 缓存，模型变更时清空）。"""
+        self._load_models()
+        tree = self._tree_cache.get(tab_uid)
+        if tree is None:
+            tree = self._tree_cache[tab_uid] = self._build_tree(tab_uid)
+        return tree
 
     def show(self, page_title):
         """显示页面结构树。"""
@@ -117,40 +273,35 @@ class PageTool:
         if not tab_uid:
             print(f"Page '{page_title}' not found")
             return None
-        cm = self._children_map()
-        tree = self._build_tree(tab_uid, cm)
-        self._print_tree(tree, 0)
+        tree = self._page_tree(tab_uid)
+        self._print_tree(tree)
         return tree
 
-    def _print_tree(self, node, depth):
+    def _print_tree(self, tree):
+        for node, depth in self._iter_tree(tree):
+            self._print_node(node, depth)
+
+    def _print_node(self, node, depth):
         indent = "  " * depth
         use = node["use"]
         u = node["uid"]
-        sp = node.get("stepParams", {})
 
         # Extract useful info
         info = []
-        fs = sp.get("fieldSettings", {}).get("init", {})
-        if fs.get("fieldPath"):
-            info.append(f"field={fs['fieldPath']}")
-        if fs.get("collectionName"):
-            info.append(f"coll={fs['collectionName']}")
-        rs = sp.get("resourceSettings", {}).get("init", {})
-        if rs.get("collectionName"):
-            info.append(f"coll={rs['collectionName']}")
-        cs = sp.get("cardSettings", {}).get("titleDescription", {})
-        if cs.get("title"):
-            info.append(f"title={cs['title']}")
-        ts = sp.get("tableColumnSettings", {})
-        if ts.get("title", {}).get("title"):
-            info.append(f"title={ts['title']['title']}")
+        if node["field_path"]:
+            info.append(f"field={node['field_path']}")
+        if node["field_coll"]:
+            info.append(f"coll={node['field_coll']}")
+        if node["coll"]:
+            info.append(f"coll={node['coll']}")
+        if node["title"]:
+            info.append(f"title={node['title']}")
+        if node["col_title"]:
+            info.append(f"title={node['col_title']}")
 
         detail = f" ({', '.join(info)})" if info else ""
         print(f"{indent}{use} [{u}]{detail}")
 
-        for child in node.get("children", []):
-            self._print_tree(child, depth + 1)
-
     # ── 定位 ─────────────────────────────────────────────────
 
     def locate(self, page_title, block=None, field=None):
@@ -164,40 +315,18 @@ class PageTool:
         tab_uid = self._find_tab_uid(page_title)
         if not tab_uid:
             return None
-        cm = self._children_map()
-        tree = self._build_tree(tab_uid, cm)
+        tree = self._page_tree(tab_uid)
         return self._find_in_tree(tree, block, field)
 
-    def _find_in_tree(self, node, block, field):
-        use = node["use"]
-        sp = node.get("stepParams", {})
-
-        # Block-level matching
-        if block and not field:
-            block_map = {
-                "table": "TableBlockModel",
-                "addnew": "AddNewActionModel",
-                "edit": "EditActionModel",
-                "filter": "FilterFormModel",
-                "details": "DetailsBlockModel",
-                "form_create": "CreateFormModel",
-                "form_edit": "EditFormModel",
-            }
-            target_use = block_map.get(block, block)
-            if use == target_use:
+    def _find_in_tree(self, tree, block, field):
+        # Block-level matching (only when no field given)
+        target_use = _BLOCK_MAP.get(block, block) if block and not field else None
+        for node, _ in self._iter_tree(tree):
+            if target_use and node["use"] == target_use:
                 return node["uid"]
-
-        # Field-level matching
-        if field:
-            fp = sp.get("fieldSettings", {}).get("init", {}).get("fieldPath", "")
-            if fp == field:
+            # Field-level matching
+            if field and node["field_path"] == field:
                 return node["uid"]
-
-        # Recurse
-        for child in node.get("children", []):
-            found = self._find_in_tree(child, block, field)
-            if found:
-                return found
         return None
 
     def locate_all(self, page_title, use_filter=None, field_filter=None):
@@ -205,37 +334,40 @@ class PageTool:
         tab_uid = self._find_tab_uid(page_title)
         if not tab_uid:
             return []
-        cm = self._children_map()
-        tree = self._build_tree(tab_uid, cm)
+        tree = self._page_tree(tab_uid)
+        if use_filter and field_filter:
+            return list(self._use_field_index(tab_uid, tree).get((use_filter, field_filter), ()))
+        return self._collect_matches(tree, use_filter, field_filter)
+
+    def _use_field_index(self, tab_uid, tree):
+        """(use, field_path) → 匹配列表，每个页面树遍历一次后复用。"""
+        idx = self._match_index.get(tab_uid)
+        if idx is None:
+            idx = self._match_index[tab_uid] = {}
+            for node, _ in self._iter_tree(tree):
+                fp = node["field_path"]
+                idx.setdefault((node["use"], fp), []).append((node["uid"], node["use"], fp))
+        return idx
+
+    def _collect_matches(self, tree, use_filter, field_filter):
         results = []
-        self._collect_matches(tree, use_filter, field_filter, results)
-        return results
-
-    def _collect_matches(self, node, use_filter, field_filter, results):
-        use = node["use"]
-        sp = node.get("stepParams", {})
-        fp = sp.get("fieldSettings", {}).get("init", {}).get("fieldPath", "")
-
-        match = True
-        if use_filter and use != use_filter:
-            match = False
-        if field_filter and fp != field_filter:
-            match = False
-        if match and (use_filter or field_filter):
+        if not (use_filter or field_filter):
+            return results
+        for node, _ in self._iter_tree(tree):
+            use = node["use"]
+            if use_filter and use != use_filter:
+                continue
+            fp = node["field_path"]
+            if field_filter and fp != field_filter:
+                continue
             results.append((node["uid"], use, fp))
-
-        for child in node.get("children", []):
-            self._collect_matches(child, use_filter, field_filter, results)
+        return results
 
     # ── 修改 ─────────────────────────────────────────────────
 
-    def patch_field(self, uid_, **kwargs):
-        """修改字段属性（description, defaultValue, placeholder, hidden, disabled, tooltip）。
-
-        用法：
-            pt.patch_field("abc123", description="帮助文本", defaultValue="默认值")
-        """
-        patch = {}
+    @staticmethod
+    def _build_patch(**kwargs):
+        """字段属性 → flowModels patch dict（无有效属性时返回 {}）。"""
         eis = {}
         for k, v in kwargs.items():
             if k == "description":
@@ -253,11 +385,21 @@ class PageTool:
             elif k == "pattern":
                 eis["pattern"] = {"pattern": v}
         if eis:
-            patch["stepParams"] = {"editItemSettings": eis}
+            return {"stepParams": {"editItemSettings": eis}}
+        return {}
+
+    def patch_field(self, uid_, **kwargs):
+        """修改字段属性（description, defaultValue, placeholder, hidden, disabled, tooltip）。
+
+        用法：
+            pt.patch_field("abc123", description="帮助文本", defaultValue="默认值")
+        """
+        patch = self._build_patch(**kwargs)
         if not patch:
             print(f"No valid properties to patch")
             return False
         ok = self.nb.update(uid_, patch)
+        self._invalidate()
         if ok:
             print(f"  Patched {uid_}: {list(kwargs.keys())}")
         else:
@@ -279,6 +421,7 @@ class PageTool:
         if tcs:
             patch["stepParams"] = {"tableColumnSettings": tcs}
         ok = self.nb.update(uid_, patch)
+        self._invalidate()
         if ok:
             print(f"  Patched column {uid_}: {list(kwargs.keys())}")
         return ok
@@ -321,7 +464,7 @@ class PageTool:
         rows[new_row_id] = [[fi]]
         sizes[new_row_id] = [24]
         self.nb.update(form_grid_uid, {"stepParams": {"gridSettings": {"grid": {"rows": rows, "sizes": sizes}}}})
-        self._models = None  # invalidate cache
+        self._invalidate()
         print(f"  Added field '{field}' to form {form_grid_uid} (uid={fi})")
         return fi
 
@@ -331,8 +474,8 @@ class PageTool:
         注意：不会自动更新父 FormGridModel 的 gridSettings。
         如果需要完美清理，建议 clean_tab + 重建。
         """
-        self.nb.destroy_tree(field_uid)
-        self._models = None
+        self.nb.destroy_cascade(field_uid)
+        self._invalidate()
         print(f"  Removed field {field_uid}")
 
     def add_column(self, table_uid, coll, field, click=False, width=None, sort=None):
@@ -342,14 +485,14 @@ class PageTool:
         if sort is None:
             sort = max((c.get("sortIndex", 0) for c in children), default=-1) + 1
         cu, fu = self.nb.col(table_uid, coll, field, sort, click=click, width=width)
-        self._models = None
+        self._invalidate()
         print(f"  Added column '{field}' to table {table_uid} (uid={cu})")
         return cu
 
     def remove_column(self, column_uid):
         """删除表格列。"""
-        self.nb.destroy_tree(column_uid)
-        self._models = None
+        self.nb.destroy_cascade(column_uid)
+        self._invalidate()
         print(f"  Removed column {column_uid}")
 
     # ── 批量操作 ─────────────────────────────────────────────
@@ -361,28 +504,57 @@ class PageTool:
             {"name": {"description": "帮助文本"},
              "status": {"defaultValue": "在用"}}
 
-        自动定位字段 UID 并逐个 patch。
+        自动定位字段 UID，交给 nb.bulk_update（逐个重新 GET 后合并，不用缓存的模型快照）。
         """
+        # 一次遍历页面树，收集所有目标字段的 FormItemModel
+        matches = {}
+        tab_uid = self._find_tab_uid(page_title)
+        if tab_uid:
+            wanted = set(patches)
+            for node, _ in self._iter_tree(self._page_tree(tab_uid)):
+                if node["use"] == "FormItemModel" and node["field_path"] in wanted:
+                    matches.setdefault(node["field_path"], []).append(node["uid"])
+
         results = {}
+        items, owners = [], []  # owners[i] = (field_name, props) for items[i]
         for field_name, props in patches.items():
-            matches = self.locate_all(page_title, use_filter="FormItemModel", field_filter=field_name)
-            if not matches:
+            results[field_name] = False
+            if field_name not in matches:
                 print(f"  Field '{field_name}' not found in '{page_title}'")
-                results[field_name] = False
                 continue
-            for uid_, use, fp in matches:
-                ok = self.patch_field(uid_, **props)
-                results[field_name] = ok
+            patch = self._build_patch(**props)
+            if not patch:
+                print(f"No valid properties to patch")
+                continue
+            for uid_ in matches[field_name]:
+                items.append((uid_, patch))
+                owners.append((field_name, props))
+
+        oks = self.nb.bulk_update(items)
+        if items:
+            self._invalidate()
+        for (uid_, _), (field_name, props), ok in zip(items, owners, oks):
+            if ok:
+                print(f"  Patched {uid_}: {list(props.keys())}")
+            else:
+                print(f"  Failed to patch {uid_}")
+            results[field_name] = ok
         return results
 
     # ── 信息查询 ─────────────────────────────────────────────
 
     def info(self, uid_):
-        """获取节点完整信息。"""
+        """获取节点完整信息（LRU 缓存，修改/增删节点时失效）。"""
+        if uid_ in self._info_cache:
+            self._info_cache.move_to_end(uid_)
+            return self._info_cache[uid_]
         r = self.nb.s.get(f"{self.nb.base}/api/flowModels:get?filterByTk={uid_}")
-        if r.ok:
-            return r.json().get("data", {})
-        return None
+        if not r.ok:
+            return None
+        data = self._info_cache[uid_] = r.json().get("data", {})
+        if len(self._info_cache) > _INFO_CACHE_SIZE:
+            self._info_cache.popitem(last=False)
+        return data
 
     def pages(self):
         """列出所有页面（flowPage 路由）。"""
@@ -413,6 +585,14 @@ class PageTool:
 # CLI
 # ═══════════════════════════════════════════════════════════════
 
+def _prop_arg(p):
+    """argparse type for --prop: "key=value" -> (key, value)."""
+    k, sep, v = p.partition("=")
+    if not sep or not k:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {p!r}")
+    return k, v
+
+
 def main():
     parser = argparse.ArgumentParser(description="NocoBase FlowModel CRUD tool")
     sub = parser.add_subparsers(dest="cmd")
@@ -437,7 +617,8 @@ def main():
     # patch
     p_patch = sub.add_parser("patch", help="Patch field properties")
     p_patch.add_argument("uid", help="Node UID")
-    p_patch.add_argument("--prop", action="append", help="key=value property", required=True)
+    p_patch.add_argument("--prop", action="append", type=_prop_arg,
+                         help="key=value property", required=True)
 
     # add-field
     p_af = sub.add_parser("add-field", help="Add field to form")
@@ -467,7 +648,7 @@ def main():
         parser.print_help()
         return
 
-    pt = PageTool()
+    pt = PageTool(eager=args.cmd in ("show", "locate"))
 
     if args.cmd == "show":
         pt.show(args.page)
@@ -492,12 +673,11 @@ def main():
 
     elif args.cmd == "patch":
         props = {}
-        for p in args.prop:
-            k, v = p.split("=", 1)
+        for k, v in args.prop:
             # Try to parse as JSON value, fallback to string
             try:
-                v = json.loads(v)
-            except (json.JSONDecodeError, ValueError):
+                v = _json_loads(v)
+            except ValueError:  # json / orjson JSONDecodeError
                 pass
             props[k] = v
         pt.patch_field(args.uid, **props)
@@ -57,7 +57,70 @@
     wb.summary()
 """
 
-import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import orjson  # 可选：请求体序列化（比 requests 内置的 json.dumps 快）
+except ImportError:
+    orjson = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 基础引擎条件节点的公共配置
+_COND_BASIC = {"rejectOnFalse": False, "engine": "basic"}
+
+
+def _response_json(r):
+    """解析响应体；有 orjson 时直接解析 bytes。非 JSON 返回 {}。"""
+    try:
+        return orjson.loads(r.content) if orjson is not None else r.json()
+    except ValueError:
+        return {}
+
+# list_workflows() 结果缓存时长（秒）
+_WF_CACHE_TTL = 5.0
+
+
+@lru_cache(maxsize=512)
+def _ctx_ref(field):
+    """触发数据字段引用 "{{$context.data.<field>}}"（按字段缓存并 intern）。"""
+    return sys.intern("{{$context.data.%s}}" % field)
+
+
+# update() 默认过滤条件：只会被序列化，共享同一个 dict
+_DEFAULT_ID_FILTER = {"id": _ctx_ref("id")}
+
+
+@lru_cache(maxsize=256, typed=True)
+def _eq_calculation(field, value):
+    """condition_equal 的 calculation 树，按 (field, value) 缓存。
+
+    结果在多个节点间共享：节点 config 只会被序列化提交，不会被修改。
+    typed=True 保证 1 / True / 1.0 各自独立缓存。
+    """
+    ref = _ctx_ref(field)
+    if value is None:
+        return {
+            "group": {
+                "type": "or",
+                "calculations": [
+                    {"calculator": "equal", "operands": [ref, None]},
+                    {"calculator": "equal", "operands": [ref, ""]},
+                ]
+            }
+        }
+    return {
+        "group": {
+            "type": "and",
+            "calculations": [
+                {"calculator": "equal", "operands": [ref, value]}
+            ]
+        }
+    }
 
 
 # ══════════════════════════════════════════════════════════════
@@ -72,12 +135,23 @@ class NodeRef:
         n.on_true().update(...)   # 真分支
         n.on_false().update(...)  # 假分支
         n.then().sql(...)         # 条件节点之后的主线下游
+
+    batch 模式下 id 先是占位 id，flush() 后原地换成真实 id；读取 .key 时
+    若节点仍在排队，会先 flush() 该工作流以拿到服务端生成的 key。
     """
 
+    __slots__ = ("wf", "id", "_key")
+
     def __init__(self, wf, node_id, node_key):
         self.wf = wf
         self.id = node_id
-        self.key = node_key
+        self._key = node_key
+
+    @property
+    def key(self):
+        if self.id in self.wf._pending_refs:
+            self.wf.flush()
+        return self._key
 
     def on_true(self):
         """真分支 (branchIndex=1)。"""
@@ -102,6 +176,8 @@ class _NodeMixin:
     子类需提供 _make_node(type, title, config) -> NodeRef。
     """
 
+    __slots__ = ()
+
     def update(self, collection, values, filter=None, title=None):
         """创建 update 节点。
 
@@ -110,7 +186,7 @@ class _NodeMixin:
         filter:     匹配记录的条件（默认 {"id": "{{$context.data.id}}"}）
         """
         if filter is None:
-            filter = {"id": "{{$context.data.id}}"}
+            filter = _DEFAULT_ID_FILTER
         title = title or f"更新 {collection}"
         return self._make_node("update", title, {
             "collection": collection,
@@ -156,49 +232,24 @@ class _NodeMixin:
         field: 字段名（自动加 $context.data. 前缀）
         value: 期望值，None 表示检查为空（null 或 ""）
         """
-        if value is None:
-            calc = {
-                "group": {
-                    "type": "or",
-                    "calculations": [
-                        {"calculator": "equal",
-                         "operands": [f"{{{{$context.data.{field}}}}}", None]},
-                        {"calculator": "equal",
-                         "operands": [f"{{{{$context.data.{field}}}}}", ""]},
-                    ]
-                }
-            }
-        else:
-            calc = {
-                "group": {
-                    "type": "and",
-                    "calculations": [
-                        {"calculator": "equal",
-                         "operands": [f"{{{{$context.data.{field}}}}}", value]}
-                    ]
-                }
-            }
+        try:
+            calc = _eq_calculation(field, value)
+        except TypeError:  # 不可哈希的 value（list/dict）不走缓存
+            calc = _eq_calculation.__wrapped__(field, value)
         title = title or f"{field} == {value!r}"
-        return self._make_node("condition", title, {
-            "rejectOnFalse": False,
-            "engine": "basic",
-            "calculation": calc
-        })
+        return self._make_node("condition", title,
+                               {**_COND_BASIC, "calculation": calc})
 
     def condition_in(self, field, values, title=None):
         """创建条件节点：$context.data.field in [values...]。
 
         多个值用 OR 连接。
         """
-        calcs = [
-            {"calculator": "equal",
-             "operands": [f"{{{{$context.data.{field}}}}}", v]}
-            for v in values
-        ]
+        ref = _ctx_ref(field)
+        calcs = [{"calculator": "equal", "operands": [ref, v]} for v in values]
         title = title or f"{field} in {values!r}"
         return self._make_node("condition", title, {
-            "rejectOnFalse": False,
-            "engine": "basic",
+            **_COND_BASIC,
             "calculation": {"group": {"type": "or", "calculations": calcs}}
         })
 
@@ -251,21 +302,24 @@ class BranchBuilder(_NodeMixin):
     通过 NodeRef.on_true() / on_false() / on_branch(n) 获得。
     """
 
+    __slots__ = ("wf", "upstream_id", "branch_index", "_last_id", "_create")
+
     def __init__(self, wf, upstream_id, branch_index):
         self.wf = wf
         self.upstream_id = upstream_id
         self.branch_index = branch_index
         self._last_id = None
+        self._create = wf._create_node  # 绑定一次，省去每个节点的属性查找
 
     def _make_node(self, node_type, title, config):
         # 分支内第一个节点挂在分支上，后续节点链式追加
         if self._last_id is None:
-            ref = self.wf._create_node(node_type, title, config,
-                                       upstream_id=self.upstream_id,
-                                       branch_index=self.branch_index)
+            ref = self._create(node_type, title, config,
+                               upstream_id=self.upstream_id,
+                               branch_index=self.branch_index)
         else:
-            ref = self.wf._create_node(node_type, title, config,
-                                       upstream_id=self._last_id)
+            ref = self._create(node_type, title, config,
+                               upstream_id=self._last_id)
         self._last_id = ref.id
         return ref
 
@@ -276,14 +330,17 @@ class ChainBuilder(_NodeMixin):
     通过 NodeRef.then() 获得。
     """
 
+    __slots__ = ("wf", "upstream_id", "_last_id", "_create")
+
     def __init__(self, wf, upstream_id):
         self.wf = wf
         self.upstream_id = upstream_id
         self._last_id = None
+        self._create = wf._create_node
 
     def _make_node(self, node_type, title, config):
         uid = self._last_id or self.upstream_id
-        ref = self.wf._create_node(node_type, title, config, upstream_id=uid)
+        ref = self._create(node_type, title, config, upstream_id=uid)
         self._last_id = ref.id
         return ref
 
@@ -298,6 +355,11 @@ class Workflow(_NodeMixin):
     通过 WorkflowBuilder.on_create() 等方法获得，不要直接实例化。
     """
 
+    __slots__ = ("builder", "id", "key", "title", "collection", "nodes",
+                 "_last_node_id", "_enabled", "_pending_nodes", "_null_ref",
+                 "_tmp_seq", "_pending_refs", "_resolved",
+                 "_post", "_create_url", "_batch_url", "_update_url")
+
     def __init__(self, builder, wf_id, wf_key, title, collection):
         self.builder = builder
         self.id = wf_id
@@ -307,6 +369,17 @@ class Workflow(_NodeMixin):
         self.nodes = []
         self._last_node_id = None
         self._enabled = False
+        self._pending_nodes = []   # batch 模式：[(占位id, node data)]
+        self._tmp_seq = 0          # 占位id 序号，只增不减（flush 后也不复用）
+        self._pending_refs = {}    # 排队中的 占位id -> NodeRef，flush 后原地更新
+        self._resolved = {}        # 已提交的 占位id -> 真实 id（未创建的为 None）
+        # 创建失败时返回的空引用（仍可链式调用，行为同 upstream 为空）
+        self._null_ref = NodeRef(self, None, None)
+        # 每个节点都要用到的 URL / 绑定方法，构造时算好
+        self._post = builder._post
+        self._create_url = f"{builder._wf_url}/{wf_id}/nodes:create"
+        self._batch_url = f"{builder._wf_url}/{wf_id}/nodes:batchCreate"
+        self._update_url = f"{builder._wf_url}:update?filterByTk={wf_id}"
 
     # ── 内部：创建节点 ────────────────────────────────
 
@@ -315,10 +388,11 @@ class Workflow(_NodeMixin):
         """创建节点并自动链接。返回 NodeRef。
 
         被 _NodeMixin 方法和 BranchBuilder/ChainBuilder 调用。
+        batch 模式下只入队并返回占位 id（$tmpN），enable()/flush() 时统一提交。
+        flush 前拿到的 NodeRef/Builder 仍持有占位 id，这里换成真实 id。
         """
-        s = self.builder.nb.s
-        base = self.builder.nb.base
-
+        if upstream_id in self._resolved:
+            upstream_id = self._resolved[upstream_id]
         data = {"type": node_type, "title": title, "config": config}
         if upstream_id is not None:
             data["upstreamId"] = upstream_id
@@ -327,68 +401,219 @@ class Workflow(_NodeMixin):
         if branch_index is not None:
             data["branchIndex"] = branch_index
 
+        if self.builder.batch:
+            nid = f"$tmp{self._tmp_seq}"
+            nkey = ""
+            self._tmp_seq += 1
+            self._pending_nodes.append((nid, data))
+        else:
+            nid, nkey = self._post_node(data)
+            if nid is None:
+                return self._null_ref
+
+        self.nodes.append({
+            "id": nid, "key": nkey, "type": node_type, "title": title
+        })
+
+        # 只有主线节点（非分支）才更新 _last_node_id
+        if branch_index is None and upstream_id is None:
+            self._last_node_id = nid
+
+        ref = NodeRef(self, nid, nkey)
+        if self.builder.batch:
+            self._pending_refs[nid] = ref
+        return ref
+
+    def _post_node(self, data):
+        """POST nodes:create，返回 (id, key)；失败记录错误并返回 (None, None)。"""
+        title = data["title"]
+
         try:
-            r = s.post(f"{base}/api/workflows/{self.id}/nodes:create", json=data)
+            r = self._post(self._create_url, json=data)
         except Exception as e:
             self.builder.errors.append(f"node create [{title}]: network error: {e}")
-            return NodeRef(self, None, None)
+            return None, None
 
         if not r.ok:
             self.builder.errors.append(
                 f"node create [{title}]: {r.status_code} {r.text[:200]}")
-            return NodeRef(self, None, None)
+            return None, None
 
-        resp = r.json()
+        resp = _response_json(r)
         if "data" not in resp:
             self.builder.errors.append(
                 f"node create [{title}]: unexpected response format")
-            return NodeRef(self, None, None)
+            return None, None
 
         node = resp["data"]
-        nid = node.get("id")
-        nkey = node.get("key", "")
-        self.nodes.append({
-            "id": nid, "key": nkey, "type": node_type, "title": title
-        })
+        return node.get("id"), node.get("key", "")
 
-        # 只有主线节点（非分支）才更新 _last_node_id
-        if branch_index is None and upstream_id is None:
-            self._last_node_id = nid
+    def flush(self):
+        """提交 batch 模式下排队的节点。enable() 会自动调用。
 
-        return NodeRef(self, nid, nkey)
+        优先一次 POST nodes:batchCreate；服务端不支持时逐个创建（见
+        _create_pending），并把占位 id 替换为真实 id。
+        """
+        pending, self._pending_nodes = self._pending_nodes, []
+        if not pending:
+            return
 
-    def _make_node(self, node_type, title, config):
-        """_NodeMixin 接口：在主线追加节点。"""
-        return self._create_node(node_type, title, config)
+        real, dropped = self._batch_create(pending), {}
+        if real is None:
+            real, dropped = self._create_pending(pending)
+
+        if dropped:
+            self.nodes[:] = [n for n in self.nodes if n["id"] not in dropped]
+        for n in self.nodes:
+            if n["id"] in real:
+                n["id"], n["key"] = real[n["id"]]
+        if self._last_node_id in real:
+            self._last_node_id = real[self._last_node_id][0]
+        elif self._last_node_id in dropped:
+            self._last_node_id = dropped[self._last_node_id]
+
+        # 已发出的 NodeRef 原地换成真实 id/key；未创建的同非 batch 模式的空引用
+        for tmp, _ in pending:
+            nid, nkey = real.get(tmp, (None, None))
+            self._resolved[tmp] = nid
+            ref = self._pending_refs.pop(tmp, None)
+            if ref is not None:
+                ref.id, ref._key = nid, nkey
+
+    def compile(self):
+        """返回尚未提交的节点图（batch 模式），不发请求。
+
+        {"nodes": [{id, type, title, config, upstreamId?, branchIndex?}],
+         "edges": [{"from", "to", "branchIndex"}]}，id 为占位 id。
+        """
+        return self._compile(self._pending_nodes)
+
+    @staticmethod
+    def _compile(pending):
+        nodes, edges = [], []
+        for tmp, data in pending:
+            nodes.append(dict(data, id=tmp))
+            if "upstreamId" in data:
+                edges.append({"from": data["upstreamId"], "to": tmp,
+                              "branchIndex": data.get("branchIndex")})
+        return {"nodes": nodes, "edges": edges}
+
+    def _create_pending(self, pending):
+        """逐个 POST 排队节点，返回 ({占位id: (id, key)}, {未创建的占位id: 顶替的上游id})。
+
+        挂载点 = (upstreamId, branchIndex)。同一挂载点后插入的节点会排到先插入的
+        前面，必须按入队顺序串行；不同挂载点（如 on_true/on_false 两条分支）
+        互不影响，上游就绪后按轮次并发提交（builder.workers 个线程）。
+
+        某个节点创建失败时与非 batch 模式一致：后续链上节点接到它的上游
+        （占用它的挂载点）；挂在它分支里的节点无处可挂，跳过并记入 errors。
+        上游是本批之外的占位id（永远不会就绪）的节点同样跳过，不会空转。
+        """
+        tmp_ids = {tmp for tmp, _ in pending}
+        real = {}
+        failed = {}    # 创建失败的占位id -> 它的挂载点 (upstreamId, branchIndex)
+        skipped = set()
+        queue = pending
+        workers = self.builder.workers
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while queue:
+                wave, rest, slots = [], [], set()
+                for tmp, data in queue:
+                    up = data.get("upstreamId")
+                    slot = (up, data.get("branchIndex"))
+                    if up in tmp_ids:
+                        ready = up in real or up in failed or up in skipped
+                    else:
+                        ready = not (isinstance(up, str) and up.startswith("$tmp"))
+                    if slot in slots or not ready:
+                        rest.append((tmp, data))
+                    elif up in skipped or (up in failed and "branchIndex" in data):
+                        skipped.add(tmp)
+                        self.builder.errors.append(
+                            f"node create [{data.get('title')}]: skipped, "
+                            f"upstream node was not created")
+                    else:
+                        if up in real:
+                            data = {**data, "upstreamId": real[up][0]}
+                        elif up in failed:
+                            data = {k: v for k, v in data.items()
+                                    if k not in ("upstreamId", "branchIndex")}
+                            new_up, branch = failed[up]
+                            if new_up is not None:
+                                data["upstreamId"] = new_up
+                            if branch is not None:
+                                data["branchIndex"] = branch
+                        wave.append((tmp, data))
+                    slots.add(slot)
+                if len(rest) == len(queue):
+                    # 一轮下来没有任何节点就绪：剩下的上游永远等不到，全部跳过
+                    for tmp, data in rest:
+                        skipped.add(tmp)
+                        self.builder.errors.append(
+                            f"node create [{data.get('title')}]: skipped, "
+                            f"upstream {data.get('upstreamId')} never became ready")
+                    break
+                run = pool.map if pool else map
+                results = run(self._post_node, [data for _, data in wave])
+                for (tmp, data), res in zip(wave, results):
+                    if res[0] is None:
+                        failed[tmp] = (data.get("upstreamId"), data.get("branchIndex"))
+                    else:
+                        real[tmp] = res
+                queue = rest
+        finally:
+            if pool:
+                pool.shutdown()
+        dropped = {tmp: up for tmp, (up, _) in failed.items()}
+        dropped.update(dict.fromkeys(skipped))
+        return real, dropped
+
+    def _batch_create(self, pending):
+        """尝试 nodes:batchCreate。返回 {占位id: (id, key)}，不支持时返回 None。"""
+        if self.builder._batch_supported is False:
+            return None
+        try:
+            r = self._post(self._batch_url, json=self._compile(pending))
+        except Exception:
+            return None
+        created = _response_json(r).get("data") if r.ok else None
+        if not isinstance(created, list) or len(created) != len(pending):
+            # 404 / 格式不符：记住不支持，后续工作流直接走逐个创建
+            self.builder._batch_supported = False
+            return None
+        self.builder._batch_supported = True
+        return {tmp: (node.get("id"), node.get("key", ""))
+                for (tmp, _), node in zip(pending, created)}
+
+    # _NodeMixin 接口：在主线追加节点。签名兼容，直接复用 _create_node 少一层调用
+    _make_node = _create_node
 
     # ── 启用/禁用 ────────────────────────────────────
 
     def enable(self):
-        """启用工作流。"""
-        s = self.builder.nb.s
-        base = self.builder.nb.base
+        """启用工作流（batch 模式下先提交排队的节点）。"""
+        self.flush()
         try:
-            r = s.post(f"{base}/api/workflows:update?filterByTk={self.id}",
-                       json={"enabled": True})
+            r = self._post(self._update_url, json={"enabled": True})
         except Exception as e:
             self.builder.errors.append(f"enable [{self.title}]: network error: {e}")
             return
         if r.ok:
             self._enabled = True
             self.builder.created += 1
+            self.builder._mark_enabled(self.id, True)
         else:
             self.builder.errors.append(f"enable [{self.title}]: {r.text[:200]}")
 
     def disable(self):
         """禁用工作流。"""
-        s = self.builder.nb.s
-        base = self.builder.nb.base
         try:
-            s.post(f"{base}/api/workflows:update?filterByTk={self.id}",
-                   json={"enabled": False})
+            self._post(self._update_url, json={"enabled": False})
         except Exception:
             pass
         self._enabled = False
+        self.builder._mark_enabled(self.id, False)
 
     # ── 信息 ─────────────────────────────────────────
 
@@ -418,30 +643,63 @@ class WorkflowBuilder:
 
         wb.summary()
 
+    batch=True：节点先在本地排队（NodeRef.id 为占位 id），enable()、
+    flush()、summary() 或退出 with 块时一次性提交，N 个节点从 N 次往返
+    降为 1 次（服务端不支持时自动逐个创建，互不依赖的分支用 workers 个
+    线程并发提交）。
+
     容错：
-        - 创建前自动检查同名工作流，避免重复创建
+        - 创建前自动检查同名工作流，避免重复创建（先查本次已创建的标题；
+          check_remote_duplicates=False 时不再拉取服务端列表，适合空库初始化）
         - 网络错误和非预期 API 返回格式会记录到 self.errors
         - 调用 wb.summary() 查看完整结果
     """
 
-    def __init__(self, nb):
+    def __init__(self, nb, batch=False, workers=8, check_remote_duplicates=True):
         self.nb = nb
+        self.batch = batch
+        self.workers = workers
+        self.check_remote_duplicates = check_remote_duplicates
+        # 复用 NB 的 keep-alive 会话（连接池/重试见 NB.__init__），
+        # 绑定方法和 URL 前缀只取一次
+        self._get = nb.s.get
+        self._post = nb.s.post if orjson is None else self._orjson_post
+        self._wf_url = f"{nb.base}/api/workflows"
+        self._batch_supported = None  # nodes:batchCreate 探测结果
         self.workflows = []
         self.created = 0
         self.errors = []
-        self._existing_titles = None  # lazy loaded
-
-    def _load_existing_titles(self):
-        """加载已有工作流标题集合（用于重名检查）。"""
-        if self._existing_titles is not None:
-            return
-        wfs = self.list_workflows()
-        self._existing_titles = {w.get("title", "") for w in wfs}
+        self._wf_cache = {}  # {(filter_enabled, title_prefix): (monotonic ts, [wf...])}
+        self._title_index = {}  # title -> workflow dict（全部工作流）
+        self._local_titles = {}  # 本次创建的 title -> id（查重无需请求）
+        self._cache_lock = threading.Lock()  # clean_by_prefix 并发删除时保护缓存
+
+    def _orjson_post(self, url, json=None, **kw):
+        """nb.s.post 的替身：json= 请求体用 orjson 序列化。"""
+        if json is not None:
+            kw["data"] = orjson.dumps(json)
+            kw["headers"] = _JSON_HEADERS
+        return self.nb.s.post(url, **kw)
+
+    @property
+    def existing_titles(self):
+        """已有工作流标题（只读），取自 list_workflows 缓存的标题索引。"""
+        self._load_title_index()
+        return frozenset(self._title_index)
+
+    def _load_title_index(self):
+        """首次使用时拉取全部工作流建立标题索引。
+
+        之后本实例的创建/删除会同步更新索引，不随 _WF_CACHE_TTL 过期重拉，
+        避免批量创建时每隔几秒就把整个列表再拉一遍。
+        """
+        if (None, None) not in self._wf_cache:
+            self.list_workflows()
 
     def _check_duplicate(self, title):
         """检查同名工作流是否已存在。返回 True 表示有重复。"""
-        self._load_existing_titles()
-        if title in self._existing_titles:
+        if title in self._local_titles or (
+                self.check_remote_duplicates and self.find_by_title(title) is not None):
             print(f"  [SKIP] '{title}' already exists")
             return True
         return False
@@ -466,7 +724,7 @@ class WorkflowBuilder:
         }
 
         try:
-            r = self.nb.s.post(f"{self.nb.base}/api/workflows:create", json=data)
+            r = self._post(f"{self._wf_url}:create", json=data)
         except Exception as e:
             self.errors.append(f"workflow create [{title}]: network error: {e}")
             return None
@@ -476,7 +734,7 @@ class WorkflowBuilder:
                 f"workflow create [{title}]: {r.status_code} {r.text[:200]}")
             return None
 
-        resp = r.json()
+        resp = _response_json(r)
         if "data" not in resp:
             self.errors.append(
                 f"workflow create [{title}]: unexpected response format")
@@ -488,7 +746,14 @@ class WorkflowBuilder:
         coll = config.get("collection", "")
         wf = Workflow(self, wf_id, wf_key, title, coll)
         self.workflows.append(wf)
-        self._existing_titles.add(title)
+        self._local_titles[title] = wf_id
+        # 新建的工作流是禁用状态：同步进 全部/仅禁用 且前缀匹配的缓存
+        entry = {"id": wf_id, "key": wf_key, "title": title,
+                 "type": wf_type, "enabled": False, "current": True}
+        for (enabled, prefix), (_, wfs) in self._wf_cache.items():
+            if enabled is not True and (prefix is None or title.startswith(prefix)):
+                wfs.append(dict(entry))
+        self._title_index.setdefault(title, entry)
         return wf
 
     # ── 触发器快捷方式 ─────────────────────────────────
@@ -584,25 +849,54 @@ class WorkflowBuilder:
 
     # ── 查询/管理 ──────────────────────────────────────
 
-    def list_workflows(self, filter_enabled=None):
+    def list_workflows(self, filter_enabled=None, title_prefix=None, refresh=False):
         """列出所有工作流（当前版本）。
 
         filter_enabled: True=只列启用的，False=只列禁用的，None=全部
-        返回: workflow dict 列表
+        title_prefix:   只列标题以此开头的（服务端过滤）
+        refresh:        True 时忽略缓存，重新请求
+        返回: workflow dict 列表（_WF_CACHE_TTL 秒内复用上次结果）
         """
+        key = (filter_enabled, title_prefix)
+        hit = None if refresh else self._wf_cache.get(key)
+        if hit and time.monotonic() - hit[0] < _WF_CACHE_TTL:
+            return list(hit[1])
+
         params = {"pageSize": 200}
         if filter_enabled is not None:
             params["filter[enabled]"] = str(filter_enabled).lower()
+        if title_prefix is not None:
+            params["filter[title][$startsWith]"] = title_prefix
         try:
-            r = self.nb.s.get(f"{self.nb.base}/api/workflows:list",
-                              params=params)
+            r = self._get(f"{self._wf_url}:list", params=params)
         except Exception:
             return []
         if not r.ok:
             return []
         # 只返回 current 版本（过滤旧版本）
         all_wfs = r.json().get("data", [])
-        return [w for w in all_wfs if w.get("current", True)]
+        wfs = [w for w in all_wfs if w.get("current", True)]
+        self._wf_cache[key] = (time.monotonic(), wfs)
+        if key == (None, None):
+            self._reindex(wfs)
+        return list(wfs)
+
+    def _mark_enabled(self, wf_id, enabled):
+        """同步缓存里的 enabled 状态；按 enabled 过滤的缓存直接作废。"""
+        with self._cache_lock:
+            for key, (_, wfs) in list(self._wf_cache.items()):
+                if key[0] is not None:
+                    del self._wf_cache[key]
+                    continue
+                for w in wfs:
+                    if w.get("id") == wf_id:
+                        w["enabled"] = enabled
+
+    def _reindex(self, wfs):
+        """重建 title -> workflow 索引。同名时保留第一个，与线性查找结果一致。"""
+        self._title_index = {}
+        for w in wfs:
+            self._title_index.setdefault(w.get("title"), w)
 
     def get_workflow(self, wf_id):
         """获取单个工作流详情（含节点列表）。
@@ -610,14 +904,12 @@ class WorkflowBuilder:
         返回 (workflow_data, nodes_list) 或 (None, [])。
         """
         try:
-            r = self.nb.s.get(
-                f"{self.nb.base}/api/workflows:get?filterByTk={wf_id}")
+            r = self._get(f"{self._wf_url}:get?filterByTk={wf_id}")
             if not r.ok:
                 return None, []
             wf_data = r.json().get("data")
 
-            r2 = self.nb.s.get(
-                f"{self.nb.base}/api/workflows/{wf_id}/nodes:list")
+            r2 = self._get(f"{self._wf_url}/{wf_id}/nodes:list")
             nodes = r2.json().get("data", []) if r2.ok else []
 
             return wf_data, nodes
@@ -626,56 +918,86 @@ class WorkflowBuilder:
 
     def find_by_title(self, title):
         """按标题查找工作流。返回 workflow dict 或 None。"""
-        for w in self.list_workflows():
-            if w.get("title") == title:
-                return w
-        return None
+        self._load_title_index()
+        return self._title_index.get(title)
+
+    def delete_workflow(self, wf_id, *, was_enabled=None):
+        """删除工作流（自动先禁用）。
 
-    def delete_workflow(self, wf_id):
-        """删除工作流（自动先禁用）。"""
+        was_enabled: 刚从服务端取到的 enabled 状态，False 可省掉禁用请求
+                     （不要传缓存里的值，其他客户端可能已经启用了它）
+        """
         try:
-            self.nb.s.post(
-                f"{self.nb.base}/api/workflows:update?filterByTk={wf_id}",
-                json={"enabled": False})
-            r = self.nb.s.post(
-                f"{self.nb.base}/api/workflows:destroy?filterByTk={wf_id}")
-            return r.ok
+            if was_enabled is not False:
+                self._post(f"{self._wf_url}:update?filterByTk={wf_id}",
+                           json={"enabled": False})
+            r = self._post(f"{self._wf_url}:destroy?filterByTk={wf_id}")
         except Exception:
             return False
+        if r.ok:
+            with self._cache_lock:
+                for _, wfs in self._wf_cache.values():
+                    wfs[:] = [w for w in wfs if w.get("id") != wf_id]
+                self._reindex(self._wf_cache.get((None, None), (0, []))[1])
+                self._local_titles = {t: i for t, i in self._local_titles.items()
+                                      if i != wf_id}
+        return r.ok
 
     def delete_by_title(self, title):
         """按标题删除工作流。返回是否找到并删除。"""
         wf = self.find_by_title(title)
         if wf:
-            ok = self.delete_workflow(wf["id"])
-            if ok and self._existing_titles is not None:
-                self._existing_titles.discard(title)
-            return ok
+            return self.delete_workflow(wf["id"])
         return False
 
     def clean_by_prefix(self, prefix):
-        """删除所有标题以 prefix 开头的工作流。返回删除数量。"""
+        """删除所有标题以 prefix 开头的工作流（并发删除）。返回删除数量。"""
+        # 服务端按前缀过滤；本地再校验一次，兼容不支持 $startsWith 的版本。
+        # 强制重新拉取：删除前是否要先禁用取决于最新的 enabled 状态
+        targets = [w for w in self.list_workflows(title_prefix=prefix, refresh=True)
+                   if w.get("title", "").startswith(prefix)]
         count = 0
-        for w in self.list_workflows():
-            if w.get("title", "").startswith(prefix):
-                if self.delete_workflow(w["id"]):
-                    count += 1
-                    print(f"  [DEL] {w['title']} (id={w['id']})")
+        if targets:
+            def delete(w):
+                return self.delete_workflow(w["id"], was_enabled=w.get("enabled"))
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(targets))) as pool:
+                for w, ok in zip(targets, pool.map(delete, targets)):
+                    if ok:
+                        count += 1
+                        print(f"  [DEL] {w['title']} (id={w['id']})")
         # 重置缓存
-        self._existing_titles = None
+        self._wf_cache.clear()
+        self._title_index = {}
         return count
 
+    # ── 提交 / 上下文管理 ─────────────────────────────
+
+    def flush(self):
+        """提交所有工作流在 batch 模式下排队的节点（未 enable() 的也会提交）。"""
+        for wf in self.workflows:
+            wf.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False
+
     # ── Summary ──────────────────────────────────────
 
     def summary(self):
-        """打印本次构建的工作流汇总。"""
-        print(f"\n{'='*60}")
-        print(f"  Workflows: {self.created} enabled, {len(self.workflows)} total")
-        print(f"  Errors: {len(self.errors)}")
-        print(f"{'='*60}")
+        """打印本次构建的工作流汇总（拼好后一次写出）。先提交排队中的节点。"""
+        self.flush()
+        lines = [
+            f"\n{'='*60}",
+            f"  Workflows: {self.created} enabled, {len(self.workflows)} total",
+            f"  Errors: {len(self.errors)}",
+            f"{'='*60}",
+        ]
         for wf in self.workflows:
-            info = wf.info()
-            status = "[ON]" if info["enabled"] else "[--]"
-            print(f"  {status} {info['title']} ({info['nodes']} nodes) id={info['id']}")
+            status = "[ON]" if wf._enabled else "[--]"
+            lines.append(f"  {status} {wf.title} ({len(wf.nodes)} nodes) id={wf.id}")
         for e in self.errors[:10]:
-            print(f"  [ERR] {e}")
+            lines.append(f"  [ERR] {e}")
+        sys.stdout.write("\n".join(lines) + "\n")
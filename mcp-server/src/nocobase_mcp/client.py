@@ -8,19 +8,85 @@ Extracted from nb_page_builder.py NB class. Provides two client variants:
 Both auto-login on construction and provide the same base URL + auth token.
 """
 
+from __future__ import annotations
+
+import base64
+import copy
+import functools
+import hashlib
+import http.client
+import importlib.util
 import json
 import os
-import urllib.request
-import urllib.error
+import stat
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import MappingProxyType
 from typing import Any, Optional
-
-import requests
+from urllib.parse import unquote, urlsplit
 
 from .utils import uid, deep_merge
 
+
+def _lazy_import(name: str):
+    """Return module ``name``, executing it only on first attribute access.
+
+    Only NB goes through requests; NocoBaseClient is stdlib-only. Deferring
+    requests/urllib3 keeps them off the server's startup path for sessions
+    that only use the data-modeling tools.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+requests = _lazy_import("requests")
+
+try:
+    import orjson  # optional: faster request-body encoding on the save path
+except ImportError:
+    orjson = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _dumps(obj) -> bytes:
+    """Encode a JSON request body (orjson when available, stdlib otherwise)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:  # e.g. ints beyond 64 bits, which stdlib json accepts
+            pass
+    return json.dumps(obj).encode()
+
+
+def _dumps_pretty(obj) -> str:
+    """Two-space indented, non-ASCII-preserving JSON text for embedding in JS."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 # ── Interface -> Model mappings (used by page building tools) ──────────
 
-DISPLAY_MAP = {
+DISPLAY_MAP = MappingProxyType({
     "input": "DisplayTextFieldModel", "textarea": "DisplayTextFieldModel",
     "email": "DisplayTextFieldModel", "phone": "DisplayTextFieldModel",
     "sequence": "DisplayTextFieldModel", "markdown": "DisplayTextFieldModel",
@@ -33,9 +99,9 @@ DISPLAY_MAP = {
     "color": "DisplayColorFieldModel", "icon": "DisplayIconFieldModel",
     "m2o": "DisplayTextFieldModel",
     "o2m": "DisplayNumberFieldModel",
-}
+})
 
-EDIT_MAP = {
+EDIT_MAP = MappingProxyType({
     "input": "InputFieldModel", "textarea": "TextareaFieldModel",
     "email": "InputFieldModel", "phone": "InputFieldModel",
     "markdown": "TextareaFieldModel",
@@ -46,12 +112,24 @@ EDIT_MAP = {
     "date": "DateOnlyFieldModel", "datetime": "DateTimeTzFieldModel",
     "color": "InputFieldModel", "icon": "InputFieldModel",
     "m2o": "RecordSelectFieldModel",
-}
+})
+
+# Tables above are shared read-only views; leaf payloads stay plain dicts so
+# they can go straight into JSON request bodies.
+_DISPLAY_GET = DISPLAY_MAP.get
+_EDIT_GET = EDIT_MAP.get
+
+# form_field props copied into editItemSettings: (key, stored as plain True)
+_FORM_PROP_MAP = (
+    ("description", False), ("tooltip", False), ("placeholder", False),
+    ("hidden", True), ("disabled", True), ("pattern", False),
+)
+_EMPTY = MappingProxyType({})
 
 
 # ── Interface -> uiSchema templates (for data modeling) ────────────────
 
-INTERFACE_TEMPLATES = {
+INTERFACE_TEMPLATES = MappingProxyType({
     "input": {
         "type": "string",
         "uiSchema": {"type": "string", "x-component": "Input"},
@@ -181,10 +259,10 @@ INTERFACE_TEMPLATES = {
         "default": None,
         "uiSchema": {"type": "object", "x-component": "Input.JSON", "x-component-props": {"autoSize": {"minRows": 5}}},
     },
-}
+})
 
 # System fields that must be created via API (not SQL)
-SYSTEM_FIELD_PAYLOADS = [
+SYSTEM_FIELD_PAYLOADS = (
     {
         "name": "createdAt", "interface": "createdAt", "type": "date", "field": "createdAt",
         "uiSchema": {
@@ -217,25 +295,23 @@ SYSTEM_FIELD_PAYLOADS = [
             "x-read-pretty": True,
         },
     },
-]
+)
 
-SYSTEM_FIELD_MAP = {"id": "id", "sort": "sort"}
+SYSTEM_FIELD_MAP = MappingProxyType({"id": "id", "sort": "sort"})
 
 
 # ── Fields format parsing (multi-column + sections) ─────────────────────
 
 def _parse_field_name(name):
     """Parse 'name*' or 'name:16' or 'name*:16' → (clean_name, width_or_None, is_required)."""
-    required = False
+    head, sep, w = name.rpartition(":")
     width = None
-    if ":" in name:
-        name, w = name.rsplit(":", 1)
-        width = int(w.strip())
+    if sep:
+        name, width = head, int(w)
     name = name.strip()
     if name.endswith("*"):
-        name = name[:-1].strip()
-        required = True
-    return name, width, required
+        return name[:-1].strip(), width, True
+    return name, width, False
 
 
 def _normalize_fields(fields):
@@ -245,12 +321,24 @@ def _normalize_fields(fields):
         1. Multi-line string (pipe syntax): "name* | code\\nstatus"
         2. List (legacy): ["name", "code", [("name",12),("code",12)], "---"]
         3. Mixed: list items also support pipe syntax
+
+    String specs are memoized; the result is shared, so callers must not mutate it.
     """
     if isinstance(fields, str):
-        # MCP JSON transport may deliver literal \n (two chars) instead of real newlines
-        fields = fields.replace("\\n", "\n")
-        fields = [l.strip() for l in fields.strip().split("\n") if l.strip()]
+        return _normalize_field_spec(fields)
+    return _normalize_field_items(fields)
+
+
+@functools.lru_cache(maxsize=256)
+def _normalize_field_spec(fields):
+    # MCP JSON transport may deliver literal \n (two chars) instead of real newlines
+    fields = fields.replace("\\n", "\n")
+    items, auto_required = _normalize_field_items(
+        [l.strip() for l in fields.strip().split("\n") if l.strip()])
+    return tuple(items), frozenset(auto_required)
 
+
+def _normalize_field_items(fields):
     result = []
     auto_required = set()
 
@@ -261,7 +349,7 @@ def _normalize_fields(fields):
         elif isinstance(item, str) and item.strip().startswith("#"):
             result.append({"type": "markdown", "content": item.strip()})
         elif isinstance(item, str) and "|" in item:
-            parts = [p.strip() for p in item.split("|")]
+            parts = item.split("|")  # _parse_field_name strips each part
             auto_width = 24 // len(parts)
             cols = []
             for part in parts:
@@ -307,10 +395,29 @@ class APIError(Exception):
         super().__init__(f"HTTP {code}: {url}\n{body[:500]}")
 
 
+# Reuse a cached auth token across CLI invocations for this long (seconds)
+TOKEN_CACHE_TTL = 24 * 3600
+
+
+def _proxy_url(parts) -> Optional[str]:
+    """Proxy for a target URL from HTTP(S)_PROXY / NO_PROXY, as urllib picks it."""
+    import urllib.request  # only needed once per client, keep it off import time
+
+    proxy = urllib.request.getproxies().get(parts.scheme)
+    if not proxy or urllib.request.proxy_bypass(parts.hostname or ""):
+        return None
+    return proxy if "://" in proxy else "http://" + proxy
+
+
 class NocoBaseClient:
-    """Thin HTTP client for NocoBase API using only urllib (no requests dependency).
+    """Thin HTTP client for NocoBase API using only the stdlib (no requests dependency).
+
+    Used by data modeling tools (collections, fields, SQL). Keeps one persistent
+    keep-alive connection per client and thread instead of a new TCP/TLS
+    handshake per call, so one client can be shared across threads.
 
-    Used by data modeling tools (collections, fields, SQL).
+    Honours HTTP_PROXY / HTTPS_PROXY / NO_PROXY like urllib: plain http goes to
+    the proxy with absolute-form targets, https is tunnelled with CONNECT.
     """
 
     def __init__(self, base_url: str, user: str = "admin@nocobase.com",
@@ -318,35 +425,154 @@ class NocoBaseClient:
         self.base = base_url.rstrip("/")
         self.user = user
         self.password = password
+        parts = urlsplit(self.base)
+        self._conn_cls = (http.client.HTTPSConnection if parts.scheme == "https"
+                          else http.client.HTTPConnection)
+        self._host = parts.netloc
+        self._prefix = parts.path
+        self._tunnel = None         # (host, headers) for CONNECT through an https proxy
+        self._proxy_headers = {}    # Proxy-Authorization for plain-http proxying
+        proxy = _proxy_url(parts)
+        if proxy:
+            pp = urlsplit(proxy)
+            self._host = pp.netloc.rpartition("@")[2]
+            auth = {}
+            if pp.username is not None:
+                cred = f"{unquote(pp.username)}:{unquote(pp.password or '')}"
+                auth["Proxy-Authorization"] = "Basic " + base64.b64encode(cred.encode()).decode()
+            if parts.scheme == "https":
+                self._tunnel = (parts.netloc, auth)
+            else:
+                self._prefix = f"{parts.scheme}://{parts.netloc}{parts.path}"
+                self._proxy_headers = auth
+        self.token = None
+        self._local = threading.local()  # .conn: this thread's connection
+
+    @property
+    def token(self):
+        return self._token
+
+    @token.setter
+    def token(self, value):
+        # Headers only change with the token: build them here, not per request
+        self._token = value
+        self._headers = {**_JSON_HEADERS, **self._proxy_headers}
+        if value:
+            self._headers["Authorization"] = f"Bearer {value}"
+
+    def login(self, use_cache: bool = True):
+        """Sign in and return the token, reusing a recent on-disk token if present."""
+        path = self._token_cache_path()
+        if use_cache:
+            token = self._read_cached_token(path)
+            if token:
+                self.token = token
+                return token
         self.token = None
-
-    def login(self):
         data = self._request("POST", "/api/auth:signIn", {
             "account": self.user, "password": self.password
         })
         self.token = data["data"]["token"]
+        self._store_token(path)
         return self.token
 
-    def _request(self, method, path, body=None, expect_empty=False):
-        url = self.base + path
-        payload = json.dumps(body).encode() if body is not None else None
-        headers = {"Content-Type": "application/json"}
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
-        req = urllib.request.Request(url, data=payload, headers=headers, method=method)
+    def _token_cache_path(self):
+        key = hashlib.md5(f"{self.base}|{self.user}".encode()).hexdigest()
+        return os.path.join(tempfile.gettempdir(), f".nb-token-{key}")
+
+    @staticmethod
+    def _read_cached_token(path):
+        """Return a fresh cached token, or None.
+
+        The cache lives in the shared temp dir, so only trust a regular file
+        (not a symlink) owned by the current user with mode 0600.
+        """
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        except OSError:
+            return None
+        with os.fdopen(fd) as f:
+            st = os.fstat(fd)
+            if (not stat.S_ISREG(st.st_mode) or stat.S_IMODE(st.st_mode) != 0o600
+                    or (hasattr(os, "getuid") and st.st_uid != os.getuid())
+                    or time.time() - st.st_mtime >= TOKEN_CACHE_TTL):
+                return None
+            return f.read().strip() or None
+
+    def _store_token(self, path):
+        """Atomically write the token, readable by the current user only."""
+        try:
+            # mkstemp creates a new 0600 file (O_EXCL), never a planted symlink
+            fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".",
+                                       dir=os.path.dirname(path))
+        except OSError:
+            return
         try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                raw = resp.read()
-                if not raw or expect_empty:
-                    return {}
-                return json.loads(raw)
-        except urllib.error.HTTPError as e:
-            body_text = ""
+            with os.fdopen(fd, "w") as f:
+                f.write(self.token)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def _request(self, method, path, body=None, expect_empty=False, _reauth=True):
+        url = self.base + path
+        payload = _dumps(body) if body is not None else None
+        status, raw = self._send(method, self._prefix + path, payload, self._headers,
+                                 discard=expect_empty)
+        if status == 401 and self.token and _reauth:
+            # Cached token expired or revoked: drop it, sign in again, retry once
             try:
-                body_text = e.read().decode()
-            except Exception:
+                os.remove(self._token_cache_path())
+            except OSError:
                 pass
-            raise APIError(e.code, body_text, url)
+            self.login(use_cache=False)
+            return self._request(method, path, body, expect_empty, _reauth=False)
+        if status >= 400:
+            raise APIError(status, raw.decode(errors="replace"), url)
+        if not raw or expect_empty:
+            return {}
+        return _loads(raw)
+
+    def _send(self, method, target, payload, headers, discard=False):
+        """Send over the persistent connection. Returns (status, body bytes).
+
+        A reused connection the server already closed (idle keep-alive timeout)
+        fails before the request is processed; reconnect and send once more.
+        With discard=True a successful body is drained (the connection needs
+        it consumed) but not kept, and b"" is returned in its place.
+        """
+        conn = getattr(self._local, "conn", None)
+        reused = conn is not None
+        if conn is None:
+            conn = self._local.conn = self._conn_cls(self._host, timeout=30)
+            if self._tunnel:
+                conn.set_tunnel(*self._tunnel)
+        try:
+            conn.request(method, target, body=payload, headers=headers)
+            resp = conn.getresponse()
+            if discard and resp.status < 400:
+                while resp.read(65536):
+                    pass
+                return resp.status, b""
+            return resp.status, resp.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            self.close()
+            if not reused:
+                raise
+            return self._send(method, target, payload, headers, discard)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Close this thread's connection (reopened on the next request)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
     def get(self, path):
         return self._request("GET", path)
@@ -361,35 +587,221 @@ class NocoBaseClient:
         return self._request("DELETE", path)
 
 
+# ── JS code templates (kpi / outline / event flows) ──────────────
+
+_RULE = f"// {'=' * 50}\n"
+_FORM_LOGIC_HEAD = "// Form Logic — formValuesChange\n" + _RULE
+_FORM_LOGIC_TAIL = (_RULE + "\n"
+                    "(async () => {\n"
+                    "  const values = ctx.form?.values || {};\n"
+                    "  // TODO: Implement form logic\n"
+                    "  console.log('Form values changed:', Object.keys(values));\n"
+                    "})();")
+_BEFORE_RENDER_TAIL = "\nctx.model.setFieldsValue(ctx.defaultValues);"
+
+_OUTLINE_HEAD = "const h = ctx.React.createElement;\nconst info = "
+_OUTLINE_MID = (
+    ";\n"
+    "const entries = Object.entries(info);\n"
+    "const tk = ctx.themeToken || {};\n"
+    "ctx.render(h('div', {style: {"
+    "padding: 10, borderRadius: 6, fontSize: 12, lineHeight: '20px', "
+    "background: tk.colorBgLayout || '#f5f5f5', "
+    "border: '1px dashed ' + (tk.colorBorder || '#d9d9d9')"
+    "}},\n"
+    "  h('div', {style: {fontWeight: 600, fontSize: 13, marginBottom: 4, "
+    "color: tk.colorPrimary || '#1890ff'}}, "
+    "'\U0001f4cb "  # clipboard emoji
+)
+_OUTLINE_TAIL = (
+    "'),\n"
+    "  ...entries.map(([k,v]) => h('div', {key: k, style: {"
+    "color: tk.colorTextSecondary || '#888'}},\n"
+    "    h('span', {style: {fontWeight: 500, color: tk.colorText || '#333', "
+    "marginRight: 4}}, k + ':'),\n"
+    "    h('span', null, typeof v === 'object' ? JSON.stringify(v) : String(v))\n"
+    "  ))\n"
+    "));"
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _comment_lines(description: str) -> str:
+    """Description lines as stripped '// ' JS comment lines."""
+    return "".join(f"// {line.strip()}\n" for line in description.strip().splitlines())
+
+
+_MONTH_PREAMBLE = (
+    "    const _now = new Date();\n"
+    "    const _ms = new Date(_now.getFullYear(), _now.getMonth(), 1).toISOString();\n"
+    "    const _me = new Date(_now.getFullYear(), _now.getMonth() + 1, 0, 23, 59, 59).toISOString();\n"
+)
+
+
+@functools.lru_cache(maxsize=512)
+def _kpi_filter(items: tuple) -> tuple:
+    """(filter_js, date_preamble) for a KPI filter given as its items.
+
+    "thisMonth" values become a $dateBetween over JS-computed month bounds.
+    Dashboards repeat the same filters across tiles, so kpi() caches the
+    all-string ones.
+    """
+    processed = {}
+    has_this_month = False
+    for k, v in items:
+        field = k.replace(".$dateOn", "")
+        if v == "thisMonth" or (isinstance(v, dict) and v.get("$dateOn") == "thisMonth"):
+            has_this_month = True
+            # Use JS placeholder — replaced below
+            processed[field] = {"$dateBetween": ["__MONTH_START__", "__MONTH_END__"]}
+        else:
+            processed[k] = v
+    raw = json.dumps(processed)
+    if not has_this_month:
+        return f", filter: {raw}", ""
+    raw = raw.replace('"__MONTH_START__"', "_ms").replace('"__MONTH_END__"', "_me")
+    return f", filter: {raw}", _MONTH_PREAMBLE
+
+
+@functools.lru_cache(maxsize=256)
+def _kpi_code(title: str, coll: str, filter_js: str, date_preamble: str, color_js: str) -> str:
+    return f"""(async () => {{
+  try {{
+{date_preamble}    const r = await ctx.api.request({{
+      url: '{coll}:list',
+      params: {{ paginate: false{filter_js} }}
+    }});
+    const count = Array.isArray(r?.data?.data) ? r.data.data.length
+                : Array.isArray(r?.data) ? r.data.length : 0;
+    ctx.render(ctx.React.createElement(ctx.antd.Statistic, {{
+      title: '{title}', value: count,
+      valueStyle: {{ fontSize: 28{color_js} }}
+    }}));
+  }} catch(e) {{
+    ctx.render(ctx.React.createElement(ctx.antd.Statistic, {{
+      title: '{title}', value: '?', valueStyle: {{ fontSize: 28 }}
+    }}));
+  }}
+}})();"""
+
+
+# Fixed parts of the table action bar: (use, subKey, subType, stepParams, sort).
+# The stepParams are shared, never mutated; save() only serializes them.
+_TABLE_ACTIONS = (
+    ("FilterActionModel", "actions", "array", {}, 1),
+    ("RefreshActionModel", "actions", "array", {}, 2),
+)
+_SUB_TABLE_ACTIONS = _TABLE_ACTIONS[1:]
+_ACTIONS_COLUMN_SP = {"tableColumnSettings": {"title": {"title": '{{t("Actions")}}'}}}
+
+
+@functools.lru_cache(maxsize=64)
+def _addnew_sp(coll: str, mode: str, size: str) -> dict:
+    """AddNewActionModel stepParams for a popup on ``coll`` (shared, read-only)."""
+    return {"popupSettings": {"openView": {"collectionName": coll, "dataSourceKey": "main",
+                                           "mode": mode, "size": size,
+                                           "pageModelClass": "ChildPageModel"}}}
+
+
+_http_adapter = None
+_http_adapter_lock = threading.Lock()
+
+
+def _shared_adapter() -> requests.adapters.HTTPAdapter:
+    """Process-wide connection pool for NB sessions.
+
+    MCP tools build a fresh NB per call; mounting one adapter on every session
+    lets those calls reuse warm keep-alive connections. Page builds fire
+    hundreds of saves, and transient gateway errors are retried. POST is not
+    in Retry's default allowed_methods, so non-idempotent creates are never
+    replayed.
+    """
+    global _http_adapter
+    if _http_adapter is None:
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        with _http_adapter_lock:
+            if _http_adapter is None:
+                _http_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=128, max_retries=Retry(
+                    total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                    raise_on_status=False))
+    return _http_adapter
+
+
+# base URL -> whether flowModels:createMany exists there. Module level because
+# get_nb_client() builds a new NB per tool call; probe once per process.
+_bulk_save_supported = {}
+
+
+def _batched(method):
+    """Run an NB method inside ``self.batch()`` so its saves go out together."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.batch():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class NB:
     """NocoBase FlowPage builder — requests-based client with session management.
 
     Used by page building and route tools. Handles auto-login, metadata caching,
     FlowModel CRUD (save/update/destroy), and all high-level page building methods.
+
+    With background_flush=True, a batch() that closes hands its saves to a
+    worker thread and returns at once, so the next block is built while the
+    server stores the previous one. Any later request waits for the worker
+    first, so ordering is unchanged; call flush() (or summary()) at the end.
     """
 
     def __init__(self, base_url: Optional[str] = None, auto_login: bool = True,
-                 account: Optional[str] = None, password: Optional[str] = None) -> None:
+                 account: Optional[str] = None, password: Optional[str] = None,
+                 background_flush: bool = False) -> None:
         self.base = base_url or os.environ.get("NB_URL", "http://localhost:14000")
         self.account = account or os.environ.get("NB_USER", "admin@nocobase.com")
         self.password = password or os.environ.get("NB_PASSWORD", "admin123")
         self.s = requests.Session()
         self.s.trust_env = False
+        adapter = _shared_adapter()
+        self.s.mount("http://", adapter)
+        self.s.mount("https://", adapter)
+        # Every body NB sends is JSON, so the content type lives on the session
+        # instead of a per-request headers dict
+        self.s.headers.update({"Connection": "keep-alive", **_JSON_HEADERS})
         self.created = 0
         self.errors = []
-        self._field_cache = {}
+        self._field_cache = {}          # coll -> (interfaces, types, targets), see _field_meta
+        self._iface_flat = {}           # (coll, field) -> interface, the col/form/detail hot path
         self._title_cache = {}
         self._sort_counters = {}
         self._timeout = 30
+        # FlowModel endpoints hit once per model: build the prefixes once
+        fm_api = f"{self.base}/api/flowModels:"
+        self._save_url = fm_api + "save"
+        self._get_tpl = fm_api + "get?filterByTk="
+        self._update_tpl = fm_api + "update?filterByTk="
+        self._destroy_tpl = fm_api + "destroy?filterByTk="
+        self._save_buffer = []          # pending save payloads inside batch()
+        self._pending_saves = {}        # uid -> buffered payload, for set_step_params
+        self._batch_depth = 0
+        self._background_flush = background_flush
+        self._flush_pool = None         # single worker, created on first background flush
+        self._inflight = []             # futures of background flushes, oldest first
+        self._children_index = None     # parentId -> [child uid], loaded on first tree walk
+        self._parent_index = {}         # uid -> parentId, for incremental removal
+        self._models_index = None       # (expires, parentId -> [model]) for find_click_field
+        self._model_cache = {}          # uid -> last known full model, for repeated event_flow
+        self._filter_mappings = {}      # grid uid -> filterManager entries, written by set_layout
+        self._fresh_tabs = set()        # tab uids created by this client and not yet laid out
         if auto_login:
             self.login()
 
     def login(self, account: Optional[str] = None, password: Optional[str] = None) -> "NB":
         account = account or self.account
         password = password or self.password
-        r = self.s.post(f"{self.base}/api/auth:signIn",
-                        json={"account": account, "password": password},
-                        timeout=self._timeout)
+        r = self._post_raw(f"{self.base}/api/auth:signIn",
+                           json={"account": account, "password": password})
         self.s.headers.update({"Authorization": f"Bearer {r.json()['data']['token']}"})
         return self
 
@@ -397,13 +809,29 @@ class NB:
 
     def _get(self, path: str, **kwargs) -> requests.Response:
         """GET with timeout. Returns response (caller checks r.ok)."""
-        kwargs.setdefault("timeout", self._timeout)
-        return self.s.get(f"{self.base}/{path}", **kwargs)
+        return self._get_url(f"{self.base}/{path}", **kwargs)
 
     def _post(self, path: str, **kwargs) -> requests.Response:
         """POST with timeout. Returns response (caller checks r.ok)."""
+        return self._post_url(f"{self.base}/{path}", **kwargs)
+
+    def _get_url(self, url: str, **kwargs) -> requests.Response:
+        if self._inflight:
+            self._wait()
+        kwargs.setdefault("timeout", self._timeout)
+        return self.s.get(url, **kwargs)
+
+    def _post_url(self, url: str, **kwargs) -> requests.Response:
+        if self._inflight:
+            self._wait()
+        return self._post_raw(url, **kwargs)
+
+    def _post_raw(self, url: str, **kwargs) -> requests.Response:
+        """POST without waiting on background flushes (the flush worker uses this)."""
         kwargs.setdefault("timeout", self._timeout)
-        return self.s.post(f"{self.base}/{path}", **kwargs)
+        if orjson is not None and kwargs.get("json") is not None:
+            kwargs["data"] = _dumps(kwargs.pop("json"))
+        return self.s.post(url, **kwargs)
 
     def _get_json(self, path: str, **kwargs):
         """GET → parse data. Raises APIError on HTTP failure."""
@@ -421,28 +849,111 @@ class NB:
 
     # ── Metadata ────────────────────────────────────────────────
 
+    @staticmethod
+    def _field_meta(fields):
+        """Column-wise field metadata: ({name: interface}, {name: type}, {name: target})."""
+        ifaces, types_, targets = {}, {}, {}
+        for f in fields:
+            name = f["name"]
+            ifaces[name] = f.get("interface", "input")
+            types_[name] = f.get("type", "string")
+            targets[name] = f.get("target", "")
+        return ifaces, types_, targets
+
+    def _preload_all(self):
+        """Warm title and field caches for every collection with one collections:list.
+
+        If NB_META_CACHE names a file, the listing is also kept there and reused
+        by later runs while the schema version (see _schema_version) is unchanged.
+        """
+        cache_path = os.environ.get("NB_META_CACHE")
+        version = self._schema_version() if cache_path else None
+        colls = self._read_meta_cache(cache_path, version) if version else None
+        if colls is None:
+            colls = self._get_json("api/collections:list?paginate=false&appends=fields") or []
+            if version:
+                self._write_meta_cache(cache_path, version, colls)
+        for c in colls:
+            self._title_cache[c["name"]] = c.get("titleField") or "name"
+            if c.get("fields") is not None:
+                self._set_meta(c["name"], c["fields"])
+
+    def _schema_version(self) -> Optional[str]:
+        """Row count + latest updatedAt of collections and fields; None if unavailable."""
+        parts = [self.base]
+        try:
+            for res in ("collections", "fields"):
+                r = self._get(f"api/{res}:list?pageSize=1&sort=-updatedAt")
+                if not r.ok:
+                    return None
+                body = r.json()
+                count = (body.get("meta") or {}).get("count")
+                if count is None:
+                    return None  # no paginated meta: nothing to detect changes with
+                rows = body.get("data") or [{}]
+                updated = rows[0].get("updatedAt")
+                if count and not updated:
+                    # No updatedAt: counts alone miss in-place edits (e.g. a
+                    # fields:update that changes an interface)
+                    return None
+                parts.append(f"{count}:{updated}")
+        except (requests.RequestException, ValueError):
+            return None
+        return "|".join(parts)
+
+    @staticmethod
+    def _read_meta_cache(path, version):
+        try:
+            with open(os.path.expanduser(path)) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cached.get("collections") if cached.get("version") == version else None
+
+    @staticmethod
+    def _write_meta_cache(path, version, colls):
+        keys = ("name", "interface", "type", "target")
+        slim = [{"name": c["name"], "titleField": c.get("titleField"),
+                 "fields": [{k: f[k] for k in keys if k in f} for f in c["fields"]]
+                 if c.get("fields") is not None else None}
+                for c in colls]
+        path = os.path.expanduser(path)
+        tmp = f"{path}.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump({"version": version, "collections": slim}, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _set_meta(self, coll, fields):
+        meta = self._field_cache[coll] = self._field_meta(fields)
+        flat = self._iface_flat
+        for name, iface in meta[0].items():
+            flat[coll, name] = iface
+
     def _load_meta(self, coll):
         if coll in self._field_cache:
             return
-        fields = self._get_json(f"api/collections/{coll}/fields:list?pageSize=200") or []
-        self._field_cache[coll] = {
-            f["name"]: {"interface": f.get("interface", "input"),
-                        "type": f.get("type", "string"),
-                        "target": f.get("target", "")}
-            for f in fields
-        }
         if not self._title_cache:
-            colls = self._get_json("api/collections:list?paginate=false") or []
-            for c in colls:
-                self._title_cache[c["name"]] = c.get("titleField") or "name"
+            self._preload_all()
+            if coll in self._field_cache:
+                return
+        # Not in the preload (created since, or server ignored appends)
+        fields = self._get_json(f"api/collections/{coll}/fields:list?pageSize=200") or []
+        self._set_meta(coll, fields)
 
     def _iface(self, coll, field):
-        self._load_meta(coll)
-        return self._field_cache.get(coll, {}).get(field, {}).get("interface", "input")
+        try:
+            return self._iface_flat[coll, field]
+        except KeyError:
+            self._load_meta(coll)
+            return self._iface_flat.get((coll, field), "input")
 
     def _target(self, coll, field):
         self._load_meta(coll)
-        return self._field_cache.get(coll, {}).get(field, {}).get("target", "")
+        return self._field_cache[coll][2].get(field, "")
 
     def _label(self, target_coll):
         self._load_meta(target_coll)
@@ -462,77 +973,258 @@ class NB:
         data = {"uid": u, "use": use, "parentId": parent,
                 "subKey": sub_key, "subType": sub_type,
                 "stepParams": sp or {}, "sortIndex": sort, "flowRegistry": {}, **kw}
-        r = self._post("api/flowModels:save", json=data)
-        if r.ok and r.json().get("data"):
-            self.created += 1
+        if self._batch_depth:
+            prev = self._pending_saves.get(u)
+            if prev is not None:
+                # flowModels:save upserts by uid: a second save of a buffered
+                # uid replaces its payload instead of queueing a duplicate row
+                prev.clear()
+                prev.update(data)
+            else:
+                # uid is assigned client-side, so children can reference it right away
+                self._save_buffer.append(data)
+                self._pending_saves[u] = data
         else:
-            self.errors.append(f"{use}({u}): {r.text[:100]}")
+            if self._inflight:
+                self._wait()
+            self._save_now(data)
+        self._index_child(parent, u)
+        self._models_index = None
+        if self._model_cache:
+            self._model_cache.pop(u, None)
         return u
 
+    def _save_now(self, data: dict) -> None:
+        err = self._post_save(data)
+        if err is None:
+            self.created += 1
+        else:
+            self.errors.append(err)
+
+    def _post_save(self, data: dict) -> Optional[str]:
+        """POST one flowModels:save. Returns None on success, else an error line."""
+        r = self._post_raw(self._save_url, json=data)
+        if r.ok and r.json().get("data"):
+            return None
+        return f"{data['use']}({data['uid']}): {r.text[:100]}"
+
+    @contextmanager
+    def batch(self):
+        """Buffer save() calls and flush them in one request on exit (nestable).
+
+        Anything that reads models back (update, destroy, listing) flushes first,
+        so code inside the block can mix saves and updates freely.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                if self._background_flush:
+                    self._flush_async()
+                else:
+                    self.flush()
+
+    def flush(self) -> None:
+        """Send buffered saves and wait for any background flush to finish."""
+        buf = self._take_buffer()
+        self._wait()
+        if buf:
+            self._send_saves(buf)
+
+    def _take_buffer(self) -> list:
+        buf, self._save_buffer = self._save_buffer, []
+        self._pending_saves = {}
+        return buf
+
+    def _flush_async(self) -> None:
+        buf = self._take_buffer()
+        if not buf:
+            return
+        if self._flush_pool is None:
+            self._flush_pool = ThreadPoolExecutor(max_workers=1)
+        self._inflight.append(self._flush_pool.submit(self._send_saves, buf))
+
+    def _wait(self) -> None:
+        """Block until background flushes are done; re-raises a worker error."""
+        while self._inflight:
+            self._inflight.pop(0).result()
+
+    def _send_saves(self, buf: list, workers: int = 8) -> None:
+        """One flowModels:createMany, else one save per model, a tree level at a time.
+
+        Without the bulk endpoint, models whose parent is not in the same buffer
+        go first, then their children, and so on. Saves within a level are
+        independent and run concurrently.
+        """
+        if _bulk_save_supported.get(self.base) is not False:
+            r = self._post_raw(f"{self.base}/api/flowModels:createMany", json={"values": buf})
+            if r.ok or r.status_code < 500:
+                # 5xx says nothing about the endpoint: probe again next time
+                _bulk_save_supported[self.base] = r.ok
+            if r.ok:
+                self.created += len(buf)
+                return
+        depth, levels = {}, []
+        for data in buf:
+            d = max(depth.get(data["parentId"], -1), depth.get(data["uid"], -1)) + 1
+            depth[data["uid"]] = d
+            if d == len(levels):
+                levels.append([])
+            levels[d].append(data)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for level in levels:
+                errs = [e for e in ex.map(self._post_save, level) if e is not None]
+                self.created += len(level) - len(errs)
+                self.errors.extend(errs)
+
     def update(self, u: str, patch: dict) -> bool:
         """Update existing FlowModel via flowModels:update (GET -> merge -> PUT).
 
         CRITICAL: flowModels:update is FULL REPLACE. Always GET first, deep merge,
         then PUT. Never send partial options.
         """
-        r = self._get(f"api/flowModels:get?filterByTk={u}")
+        self.flush()
+        self._model_cache.pop(u, None)
+        r = self._get_url(self._get_tpl + u)
         if not r.ok:
             return False
-        data = r.json().get("data", {})
+        return self._replace(u, r.json().get("data", {}), patch).ok
+
+    def _replace(self, u: str, data: dict, patch: dict) -> requests.Response:
+        """PUT data (a full model from flowModels:get) with patch merged in."""
         opts = {k: v for k, v in data.items() if k not in ("uid", "name")}
         deep_merge(opts, patch)
-        r2 = self._post(f"api/flowModels:update?filterByTk={u}",
-                        json={"options": opts})
-        return r2.ok
+        r = self._post_url(self._update_tpl + u, json={"options": opts})
+        self._models_index = None
+        return r
+
+    def set_step_params(self, u: str, step_params: dict) -> bool:
+        """Merge step_params into a model's stepParams.
+
+        A model still waiting in the batch buffer is patched locally, so a grid
+        built from scratch costs no extra request. Anything already on the
+        server goes through update() (GET -> merge -> PUT).
+        """
+        data = self._pending_saves.get(u)
+        if data is None:
+            return self.update(u, {"stepParams": step_params})
+        data["stepParams"] = deep_merge(copy.deepcopy(data["stepParams"]), step_params)
+        return True
 
     def destroy(self, u: str) -> None:
-        self._post(f"api/flowModels:destroy?filterByTk={u}")
+        self.flush()
+        self._post_url(self._destroy_tpl + u)
+        self._forget([u])
 
     def destroy_tree(self, u: str) -> int:
-        descendants = self._collect_descendants(u)
-        to_delete = descendants + [u]
-        for uid_ in reversed(to_delete):
-            self._post(f"api/flowModels:destroy?filterByTk={uid_}")
-        self._invalidate_cache()
+        levels = self._descendant_levels(u)
+        levels.insert(0, [u])
+        self._destroy_levels(levels)
+        to_delete = [x for level in levels for x in level]
+        self._forget(to_delete)
         return len(to_delete)
 
-    def _list_all(self):
-        if not hasattr(self, '_all_models_cache'):
-            self._all_models_cache = self._get_json("api/flowModels:list?paginate=false") or []
-        return self._all_models_cache
+    def _destroy_levels(self, levels, workers: int = 8) -> None:
+        """Destroy a tree level by level, deepest first; each level runs concurrently."""
+        def destroy(uid_):
+            return self._post_url(self._destroy_tpl + uid_)
+
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for level in reversed(levels):
+                if len(level) == 1:
+                    destroy(level[0])
+                else:
+                    list(ex.map(destroy, level))
+
+    def _children(self) -> dict:
+        """parentId -> [child uid], built from one flowModels:list and kept in sync after."""
+        self.flush()
+        if self._children_index is None:
+            index, parents = {}, {}
+            for m in self._get_json("api/flowModels:list?paginate=false") or []:
+                pid = m.get("parentId")
+                if pid:
+                    index.setdefault(pid, []).append(m["uid"])
+                    parents[m["uid"]] = pid
+            self._children_index, self._parent_index = index, parents
+        return self._children_index
+
+    def _index_child(self, parent, u):
+        if self._children_index is None or not parent or u in self._parent_index:
+            return
+        self._children_index.setdefault(parent, []).append(u)
+        self._parent_index[u] = parent
+
+    def _forget(self, uids):
+        """Drop destroyed uids from the index, touching only their parents' lists."""
+        self._models_index = None
+        for u in uids:
+            self._model_cache.pop(u, None)
+        if self._children_index is None:
+            return
+        gone = set(uids)
+        index, parents = self._children_index, self._parent_index
+        for u in uids:
+            index.pop(u, None)
+            pid = parents.pop(u, None)
+            if pid in index and pid not in gone:
+                index[pid] = [c for c in index[pid] if c not in gone]
 
     def _invalidate_cache(self):
-        if hasattr(self, '_all_models_cache'):
-            del self._all_models_cache
-
-    def _collect_descendants(self, root_uid):
-        all_models = self._list_all()
-        children_map = {}
-        for m in all_models:
-            pid = m.get("parentId")
-            if pid:
-                children_map.setdefault(pid, []).append(m["uid"])
-        result = []
-        queue = list(children_map.get(root_uid, []))
-        while queue:
-            uid_ = queue.pop(0)
-            result.append(uid_)
-            queue.extend(children_map.get(uid_, []))
-        return result
+        self._children_index = None
+        self._parent_index = {}
+        self._models_index = None
+        self._model_cache = {}
+
+    def _models_by_parent(self, ttl: float = 5.0) -> dict:
+        """parentId -> [full model dict], from one flowModels:list.
+
+        Kept for ``ttl`` seconds so back-to-back lookups while building a page
+        share one fetch; any save/update/destroy through this client drops it.
+        """
+        cached = self._models_index
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        self.flush()
+        by_parent = {}
+        for m in self._get_json("api/flowModels:list?paginate=false") or []:
+            by_parent.setdefault(m.get("parentId"), []).append(m)
+        self._models_index = (now + ttl, by_parent)
+        return by_parent
+
+    def _descendant_levels(self, root_uid):
+        """Descendants of root_uid grouped by depth (children first)."""
+        children_map = self._children()
+        levels = []
+        level = list(children_map.get(root_uid, []))
+        while level:
+            levels.append(level)
+            level = [c for uid_ in level for c in children_map.get(uid_, ())]
+        return levels
 
     def clean_tab(self, tab_uid):
-        to_delete = self._collect_descendants(tab_uid)
-        for uid_ in reversed(to_delete):
-            self._post(f"api/flowModels:destroy?filterByTk={uid_}")
+        """Destroy everything under tab_uid. Returns the number of models removed.
+
+        Children come from the local parent index: one flowModels:list on first
+        use, then kept current by save()/destroy(), so later cleans only send
+        the destroys.
+        """
+        levels = self._descendant_levels(tab_uid)
+        self._destroy_levels(levels)
+        to_delete = [x for level in levels for x in level]
         self._sort_counters.pop(tab_uid, None)
-        self._invalidate_cache()
+        self._forget(to_delete)
         return len(to_delete)
 
     # ── Auto-infer primitives ───────────────────────────────────
 
+    @_batched
     def col(self, tbl, coll, field, idx, click=False, width=None):
         iface = self._iface(coll, field)
-        display = DISPLAY_MAP.get(iface, "DisplayTextFieldModel")
+        display = _DISPLAY_GET(iface, "DisplayTextFieldModel")
         cu, fu = uid(), uid()
         col_sp = {"fieldSettings": {"init": {"dataSourceKey": "main", "collectionName": coll, "fieldPath": field}},
                   "tableColumnSettings": {"model": {"use": display}}}
@@ -551,11 +1243,12 @@ class NB:
         self.save(display, cu, "field", "object", fsp, 0, fu)
         return cu, fu
 
+    @_batched
     def form_field(self, grid, coll, field, idx, required=False, default=None, props=None):
         iface = self._iface(coll, field)
-        edit = EDIT_MAP.get(iface, "InputFieldModel")
+        edit = _EDIT_GET(iface, "InputFieldModel")
         fi, ff = uid(), uid()
-        props = props or {}
+        props = props or _EMPTY
         sp = {"fieldSettings": {"init": {"dataSourceKey": "main", "collectionName": coll, "fieldPath": field}}}
         eis = {}
         if required:
@@ -563,27 +1256,20 @@ class NB:
         dv = default if default is not None else props.get("defaultValue")
         if dv is not None:
             eis["initialValue"] = {"defaultValue": dv}
-        if props.get("description"):
-            eis["description"] = {"description": props["description"]}
-        if props.get("tooltip"):
-            eis["tooltip"] = {"tooltip": props["tooltip"]}
-        if props.get("placeholder"):
-            eis["placeholder"] = {"placeholder": props["placeholder"]}
-        if props.get("hidden"):
-            eis["hidden"] = {"hidden": True}
-        if props.get("disabled"):
-            eis["disabled"] = {"disabled": True}
-        if props.get("pattern"):
-            eis["pattern"] = {"pattern": props["pattern"]}
+        for key, flag in _FORM_PROP_MAP:
+            v = props.get(key)
+            if v:
+                eis[key] = {key: True if flag else v}
         if eis:
             sp["editItemSettings"] = eis
         self.save("FormItemModel", grid, "items", "array", sp, idx, fi)
         self.save(edit, fi, "field", "object", {}, 0, ff)
         return fi
 
+    @_batched
     def detail_field(self, grid, coll, field, idx):
         iface = self._iface(coll, field)
-        display = DISPLAY_MAP.get(iface, "DisplayTextFieldModel")
+        display = _DISPLAY_GET(iface, "DisplayTextFieldModel")
         di, df = uid(), uid()
         sp = {"fieldSettings": {"init": {"dataSourceKey": "main", "collectionName": coll, "fieldPath": field}},
               "detailItemSettings": {"model": {"use": display}}}
@@ -597,6 +1283,7 @@ class NB:
 
     # ── Internal builders ──────────────────────────────────────
 
+    @_batched
     def _build_form_grid(self, fg, coll, fields, required, props=None):
         """Build form fields with gridSettings (multi-column + sections)."""
         items, auto_req = _normalize_fields(fields)
@@ -637,8 +1324,9 @@ class NB:
                 sizes[row_id] = col_sizes
 
         gs = {"gridSettings": {"grid": {"rows": rows, "sizes": sizes}}}
-        self.update(fg, {"stepParams": gs})
+        self.set_step_params(fg, gs)
 
+    @_batched
     def _build_detail_grid(self, dg, coll, fields):
         """Build detail fields with gridSettings (multi-column + sections)."""
         items, _ = _normalize_fields(fields)
@@ -675,7 +1363,7 @@ class NB:
                 sizes[row_id] = col_sizes
 
         gs = {"gridSettings": {"grid": {"rows": rows, "sizes": sizes}}}
-        self.update(dg, {"stepParams": gs})
+        self.set_step_params(dg, gs)
 
     def _build_block_grid(self, rows_spec):
         """Convert declarative row specs to gridSettings JSON.
@@ -703,6 +1391,7 @@ class NB:
                 sizes[row_id] = row_sizes
         return {"grid": {"rows": rows, "sizes": sizes}}
 
+    @_batched
     def _build_tab_blocks(self, bg, coll, tab):
         """Build multiple blocks inside a BlockGridModel (details/js/sub_table)."""
         blocks = tab.get("blocks")
@@ -773,7 +1462,7 @@ class NB:
                 gs = {"gridSettings": {"grid": {
                     "rows": {row_id: row_cols},
                     "sizes": {row_id: auto}}}}
-            self.update(bg, {"stepParams": gs})
+            self.set_step_params(bg, gs)
 
         return block_uids
 
@@ -790,6 +1479,16 @@ class NB:
     def route(self, title: str, parent_id: int, icon: str = "appstoreoutlined",
               tabs: Optional[list] = None) -> tuple:
         """Create a page (flowPage) route. Returns (route_id, page_uid, tab_uid_or_dict)."""
+        rid, pu, tu = self._create_page_route(title, parent_id, icon, tabs)
+        self._insert_flow_route(pu)
+        return rid, pu, tu
+
+    def _insert_flow_route(self, pu: str) -> None:
+        self._post("api/uiSchemas:insert",
+                   json={"type": "void", "x-component": "FlowRoute", "x-uid": pu})
+
+    def _create_page_route(self, title, parent_id, icon, tabs) -> tuple:
+        """desktopRoutes:create half of route(); the page schema is inserted by the caller."""
         pu, mu = uid(), uid()
         if tabs:
             children, tu = [], {}
@@ -802,9 +1501,9 @@ class NB:
                     "schemaUid": pu, "menuSchemaUid": mu, "icon": icon,
                     "enableTabs": True, "children": children}
             result = self._post_json("api/desktopRoutes:create", json=data)
-            self._post("api/uiSchemas:insert",
-                       json={"type": "void", "x-component": "FlowRoute", "x-uid": pu})
             rid = (result or {}).get("id")
+            if rid is not None:
+                self._fresh_tabs.update(tu.values())
             return rid, pu, tu
         else:
             tu = uid()
@@ -813,9 +1512,9 @@ class NB:
                     "enableTabs": False,
                     "children": [{"type": "tabs", "schemaUid": tu, "tabSchemaName": uid(), "hidden": True}]}
             result = self._post_json("api/desktopRoutes:create", json=data)
-            self._post("api/uiSchemas:insert",
-                       json={"type": "void", "x-component": "FlowRoute", "x-uid": pu})
             rid = (result or {}).get("id")
+            if rid is not None:
+                self._fresh_tabs.add(tu)
             return rid, pu, tu
 
     def menu(self, group_title: str, parent_id: int, pages: list,
@@ -823,11 +1522,19 @@ class NB:
         """Create a menu group with child pages. Returns dict {title: tab_uid}."""
         gid = self.group(group_title, parent_id, icon=group_icon)
         tabs = {}
-        for title, icon in pages:
-            _, _, tu = self.route(title, gid, icon=icon)
-            tabs[title] = tu
+        # Routes are created in order (that is the sidebar order); each page's
+        # schema insert is independent, so those run alongside on a pool.
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            inserts = []
+            for title, icon in pages:
+                _, pu, tu = self._create_page_route(title, gid, icon, None)
+                inserts.append(ex.submit(self._insert_flow_route, pu))
+                tabs[title] = tu
+            for f in inserts:
+                f.result()
         return tabs
 
+    @_batched
     def table_block(self, parent: str, coll: str, fields: list, first_click: bool = True,
                     title: Optional[str] = None, sort: Optional[int] = None,
                     link_actions: Optional[list] = None) -> tuple:
@@ -839,11 +1546,10 @@ class NB:
         if title:
             sp["cardSettings"] = {"titleDescription": {"title": title}}
         tbl = self.save("TableBlockModel", parent, "items", "array", sp, sort)
-        self.save("FilterActionModel", tbl, "actions", "array", {}, 1)
-        self.save("RefreshActionModel", tbl, "actions", "array", {}, 2)
-        addnew = self.save("AddNewActionModel", tbl, "actions", "array", {
-            "popupSettings": {"openView": {"collectionName": coll, "dataSourceKey": "main",
-                                           "mode": "drawer", "size": "large", "pageModelClass": "ChildPageModel"}}}, 3)
+        for use, key, typ, asp, asort in _TABLE_ACTIONS:
+            self.save(use, tbl, key, typ, asp, asort)
+        addnew = self.save("AddNewActionModel", tbl, "actions", "array",
+                           _addnew_sp(coll, "drawer", "large"), 3)
         if link_actions:
             for li, la in enumerate(link_actions):
                 self.save("LinkActionModel", tbl, "actions", "array", {
@@ -852,10 +1558,10 @@ class NB:
                 }, 4 + li)
         for i, f in enumerate(fields):
             self.col(tbl, coll, f, i + 1, click=(first_click and i == 0))
-        actcol = self.save("TableActionsColumnModel", tbl, "columns", "array", {
-            "tableColumnSettings": {"title": {"title": '{{t("Actions")}}'}}}, 99)
+        actcol = self.save("TableActionsColumnModel", tbl, "columns", "array", _ACTIONS_COLUMN_SP, 99)
         return tbl, addnew, actcol
 
+    @_batched
     def filter_form(self, parent: str, coll: str, field: str = "name",
                     target_uid: Optional[str] = None, sort: Optional[int] = None,
                     label: str = "Search", search_fields: Optional[list] = None) -> tuple:
@@ -869,7 +1575,7 @@ class NB:
         }, sort)
         fg = self.save("FilterFormGridModel", fb, "grid", "object")
         self._load_meta(coll)
-        field_meta = self._field_cache.get(coll, {}).get(field, {})
+        ifaces, types_, _ = self._field_cache[coll]
         fi_sp = {
             "fieldSettings": {"init": {"dataSourceKey": "main",
                                        "collectionName": coll, "fieldPath": field}},
@@ -878,8 +1584,8 @@ class NB:
                     "filterField": {
                         "name": field,
                         "title": field.replace("_", " ").title(),
-                        "interface": field_meta.get("interface", "input"),
-                        "type": field_meta.get("type", "string"),
+                        "interface": ifaces.get(field, "input"),
+                        "type": types_.get(field, "string"),
                     },
                     **({"defaultTargetUid": target_uid} if target_uid else {}),
                 },
@@ -892,15 +1598,21 @@ class NB:
 
         if target_uid:
             paths = search_fields or [field]
-            self._filter_mappings = getattr(self, '_filter_mappings', {})
             self._filter_mappings.setdefault(parent, []).append({
                 "filterId": fi, "targetId": target_uid, "filterPaths": paths})
 
         return fb, fi
 
-    def page_layout(self, tab_uid: str) -> str:
-        """Create BlockGridModel for multi-block page. Returns grid UID."""
-        self.clean_tab(tab_uid)
+    def page_layout(self, tab_uid: str, clean: bool = True) -> str:
+        """Create BlockGridModel for multi-block page. Returns grid UID.
+
+        Existing content under the tab is destroyed first, except for tabs this
+        client just created via route()/menu() (nothing to clean) or when
+        clean=False.
+        """
+        if clean and tab_uid not in self._fresh_tabs:
+            self.clean_tab(tab_uid)
+        self._fresh_tabs.discard(tab_uid)
         return self.save("BlockGridModel", tab_uid, "grid", "object")
 
     def set_layout(self, grid_uid: str, rows_spec: list) -> None:
@@ -908,11 +1620,12 @@ class NB:
         gs = self._build_block_grid(rows_spec)
         self.update(grid_uid, {"stepParams": {"gridSettings": gs}})
 
-        fm = getattr(self, '_filter_mappings', {}).get(grid_uid, [])
+        fm = self._filter_mappings.get(grid_uid)
         if fm:
-            self._post("api/flowModels:save",
-                       json={"uid": grid_uid, "filterManager": fm})
+            self._model_cache.pop(grid_uid, None)
+            self._post_url(self._save_url, json={"uid": grid_uid, "filterManager": fm})
 
+    @_batched
     def sub_table(self, parent_grid: str, parent_coll: str, assoc: str,
                   target_coll: str, fields: list, title: Optional[str] = None) -> tuple:
         """Create association sub-table. Returns (tbl, addnew)."""
@@ -921,23 +1634,23 @@ class NB:
                                           "associationName": f"{parent_coll}.{assoc}",
                                           "sourceId": "{{ctx.view.inputArgs.filterByTk}}"}},
             **({"cardSettings": {"titleDescription": {"title": title}}} if title else {})})
-        self.save("RefreshActionModel", tbl, "actions", "array", {}, 2)
-        addnew = self.save("AddNewActionModel", tbl, "actions", "array", {
-            "popupSettings": {"openView": {"collectionName": target_coll, "dataSourceKey": "main",
-                                           "mode": "dialog", "size": "small", "pageModelClass": "ChildPageModel"}}}, 3)
+        for use, key, typ, asp, asort in _SUB_TABLE_ACTIONS:
+            self.save(use, tbl, key, typ, asp, asort)
+        addnew = self.save("AddNewActionModel", tbl, "actions", "array",
+                           _addnew_sp(target_coll, "dialog", "small"), 3)
         for i, f in enumerate(fields):
             self.col(tbl, target_coll, f, i + 1)
-        self.save("TableActionsColumnModel", tbl, "columns", "array", {
-            "tableColumnSettings": {"title": {"title": '{{t("Actions")}}'}}}, 99)
+        self.save("TableActionsColumnModel", tbl, "columns", "array", _ACTIONS_COLUMN_SP, 99)
         return tbl, addnew
 
+    @_batched
     def addnew_form(self, addnew_uid: str, coll: str, fields, required: Optional[list] = None,
                     props: Optional[dict] = None, mode: str = "drawer", size: str = "large") -> str:
         """Create form under AddNew popup. Returns childpage UID."""
         req = set(required or [])
-        self.update(addnew_uid, {"stepParams": {"popupSettings": {"openView": {
+        self.set_step_params(addnew_uid, {"popupSettings": {"openView": {
             "collectionName": coll, "dataSourceKey": "main",
-            "mode": mode, "size": size, "pageModelClass": "ChildPageModel"}}}})
+            "mode": mode, "size": size, "pageModelClass": "ChildPageModel"}}})
         cp = self.save("ChildPageModel", addnew_uid, "page", "object",
                        {"pageSettings": {"general": {"displayTitle": False, "enableTabs": False}}})
         ct = self.save("ChildPageTabModel", cp, "tabs", "array",
@@ -950,6 +1663,7 @@ class NB:
         self._build_form_grid(fg, coll, fields, req, props=props)
         return cp
 
+    @_batched
     def edit_action(self, actcol: str, coll: str, fields, required: Optional[list] = None,
                     props: Optional[dict] = None, mode: str = "drawer", size: str = "large") -> str:
         """Create Edit action + form. Returns edit action UID."""
@@ -971,13 +1685,14 @@ class NB:
         self._build_form_grid(fg, coll, fields, req, props=props)
         return ea
 
+    @_batched
     def detail_popup(self, parent_uid: str, coll: str, tabs: list,
                      mode: str = "drawer", size: str = "large") -> str:
         """Multi-tab detail popup. Returns childpage UID."""
-        self.update(parent_uid, {"stepParams": {"popupSettings": {"openView": {
+        self.set_step_params(parent_uid, {"popupSettings": {"openView": {
             "collectionName": coll, "dataSourceKey": "main",
             "mode": mode, "size": size,
-            "pageModelClass": "ChildPageModel", "uid": parent_uid}}}})
+            "pageModelClass": "ChildPageModel", "uid": parent_uid}}})
         enable_tabs = len(tabs) > 1
         cp = self.save("ChildPageModel", parent_uid, "page", "object",
                        {"pageSettings": {"general": {"displayTitle": False, "enableTabs": enable_tabs}}})
@@ -1022,65 +1737,29 @@ class NB:
         filter_ values support "thisMonth" shorthand — it will be replaced
         with a JS-computed $dateBetween range at runtime.
         """
-        filter_js = ""
-        date_preamble = ""
+        filter_js, date_preamble = "", ""
         if filter_:
-            # Pre-process "thisMonth" → JS-computed $dateBetween
-            processed = {}
-            has_this_month = False
-            for k, v in filter_.items():
-                field = k.replace(".$dateOn", "")
-                if v == "thisMonth" or (isinstance(v, dict) and v.get("$dateOn") == "thisMonth"):
-                    has_this_month = True
-                    # Use JS placeholder — replaced below
-                    processed[field] = {"$dateBetween": ["__MONTH_START__", "__MONTH_END__"]}
-                else:
-                    processed[k] = v
-            if has_this_month:
-                date_preamble = (
-                    "    const _now = new Date();\n"
-                    "    const _ms = new Date(_now.getFullYear(), _now.getMonth(), 1).toISOString();\n"
-                    "    const _me = new Date(_now.getFullYear(), _now.getMonth() + 1, 0, 23, 59, 59).toISOString();\n"
-                )
-                raw = json.dumps(processed)
-                raw = raw.replace('"__MONTH_START__"', "_ms").replace('"__MONTH_END__"', "_me")
-                filter_js = f", filter: {raw}"
+            items = tuple(filter_.items())
+            # cache only plain string filters: lru_cache keys compare 1 == True
+            if all(type(v) is str for v in filter_.values()):
+                filter_js, date_preamble = _kpi_filter(items)
             else:
-                filter_js = f", filter: {json.dumps(processed)}"
+                filter_js, date_preamble = _kpi_filter.__wrapped__(items)
         color_js = f", color:'{color}'" if color else ""
-        code = f"""(async () => {{
-  try {{
-{date_preamble}    const r = await ctx.api.request({{
-      url: '{coll}:list',
-      params: {{ paginate: false{filter_js} }}
-    }});
-    const count = Array.isArray(r?.data?.data) ? r.data.data.length
-                : Array.isArray(r?.data) ? r.data.length : 0;
-    ctx.render(ctx.React.createElement(ctx.antd.Statistic, {{
-      title: '{title}', value: count,
-      valueStyle: {{ fontSize: 28{color_js} }}
-    }}));
-  }} catch(e) {{
-    ctx.render(ctx.React.createElement(ctx.antd.Statistic, {{
-      title: '{title}', value: '?', valueStyle: {{ fontSize: 28 }}
-    }}));
-  }}
-}})();"""
+        code = _kpi_code(title, coll, filter_js, date_preamble, color_js)
         return self.js_block(parent, title, code, sort)
 
     # ── Event flows ────────────────────────────────────────────
 
     def event_flow(self, model_uid: str, event_name: str, code: str) -> Optional[str]:
-        """Add event flow (runjs step) to an existing FlowModel node."""
-        r = self._get(f"api/flowModels:get?filterByTk={model_uid}")
-        if not r.ok:
-            self.errors.append(f"event_flow GET {model_uid}: {r.text[:100]}")
-            return None
-        data = r.json().get("data", {})
-        registry = data.get("flowRegistry", {}) or {}
+        """Add event flow (runjs step) to an existing FlowModel node.
 
+        A model still in the batch buffer gets the flow added locally. Otherwise
+        the model is fetched once and PUT back; the result is kept, so further
+        flows on the same model (beforeRender + formValuesChange) skip the GET.
+        """
         flow_key, step_key = uid(), uid()
-        registry[flow_key] = {
+        flow = {
             "key": flow_key, "title": "Event flow",
             "on": {"eventName": event_name,
                    "defaultParams": {"condition": {"items": [], "logic": "$and"}}},
@@ -1088,31 +1767,35 @@ class NB:
                 "key": step_key, "use": "runjs", "sort": 1,
                 "flowKey": flow_key, "defaultParams": {"code": code}}},
         }
-        self.update(model_uid, {"flowRegistry": registry})
+        pending = self._pending_saves.get(model_uid)
+        if pending is not None:
+            pending["flowRegistry"] = {**(pending.get("flowRegistry") or {}), flow_key: flow}
+            return flow_key
+
+        self.flush()
+        data = self._model_cache.pop(model_uid, None)
+        if data is None:
+            r = self._get_url(self._get_tpl + model_uid)
+            if not r.ok:
+                self.errors.append(f"event_flow GET {model_uid}: {r.text[:100]}")
+                return None
+            data = r.json().get("data", {})
+        registry = {**(data.get("flowRegistry") or {}), flow_key: flow}
+        if self._replace(model_uid, data, {"flowRegistry": registry}).ok:
+            data["flowRegistry"] = registry
+            self._model_cache[model_uid] = data
         return flow_key
 
     def form_logic(self, form_uid: str, description: str, code: Optional[str] = None) -> Optional[str]:
         """Add formValuesChange event flow."""
         if code is None:
-            code = "// Form Logic — formValuesChange\n"
-            code += f"// {'=' * 50}\n"
-            for line in description.strip().splitlines():
-                code += f"// {line.strip()}\n"
-            code += f"// {'=' * 50}\n\n"
-            code += ("(async () => {\n"
-                     "  const values = ctx.form?.values || {};\n"
-                     "  // TODO: Implement form logic\n"
-                     "  console.log('Form values changed:', Object.keys(values));\n"
-                     "})();")
+            code = _FORM_LOGIC_HEAD + _comment_lines(description) + _FORM_LOGIC_TAIL
         return self.event_flow(form_uid, "formValuesChange", code)
 
     def before_render(self, model_uid: str, description: str, code: Optional[str] = None) -> Optional[str]:
         """Add beforeRender event flow."""
         if code is None:
-            code = "// beforeRender\n"
-            for line in description.strip().splitlines():
-                code += f"// {line.strip()}\n"
-            code += "\nctx.model.setFieldsValue(ctx.defaultValues);"
+            code = "// beforeRender\n" + _comment_lines(description) + _BEFORE_RENDER_TAIL
         return self.event_flow(model_uid, "beforeRender", code)
 
     # ── Outline (planning placeholders) ────────────────────────
@@ -1135,30 +1818,11 @@ class NB:
         """
         u = uid()
         ctx_info_with_uid = {"uid": u, **ctx_info}
-        info_json = json.dumps(ctx_info_with_uid, ensure_ascii=False, indent=2)
-
-        icon = "\U0001f4cb"  # clipboard emoji
-        code = (
-            "const h = ctx.React.createElement;\n"
-            f"const info = {info_json};\n"
-            "const entries = Object.entries(info);\n"
-            "const tk = ctx.themeToken || {};\n"
-            "ctx.render(h('div', {style: {"
-            "padding: 10, borderRadius: 6, fontSize: 12, lineHeight: '20px', "
-            "background: tk.colorBgLayout || '#f5f5f5', "
-            "border: '1px dashed ' + (tk.colorBorder || '#d9d9d9')"
-            "}},\n"
-            "  h('div', {style: {fontWeight: 600, fontSize: 13, marginBottom: 4, "
-            "color: tk.colorPrimary || '#1890ff'}}, "
-            f"'{icon} {title}'),\n"
-            "  ...entries.map(([k,v]) => h('div', {key: k, style: {"
-            "color: tk.colorTextSecondary || '#888'}},\n"
-            "    h('span', {style: {fontWeight: 500, color: tk.colorText || '#333', "
-            "marginRight: 4}}, k + ':'),\n"
-            "    h('span', null, typeof v === 'object' ? JSON.stringify(v) : String(v))\n"
-            "  ))\n"
-            "));"
-        )
+        info_json = _dumps_pretty(ctx_info_with_uid)
+
+        # info_json carries the fresh uid, so only the fixed parts are shared;
+        # one join allocates the final string without chained intermediates
+        code = "".join((_OUTLINE_HEAD, info_json, _OUTLINE_MID, title, _OUTLINE_TAIL))
 
         if kind == "column":
             return self.js_column(parent, title, code, sort or 50, width=120)
@@ -1167,12 +1831,14 @@ class NB:
         else:
             return self.js_block(parent, title, code, sort)
 
+    @_batched
     def outline_row(self, parent, *specs):
         """Create multiple outline blocks. Returns list of UIDs.
         specs: (title, ctx_info_dict) tuples.
         """
         return [self.outline(parent, t, c) for t, c in specs]
 
+    @_batched
     def outline_columns(self, table_uid, *specs):
         """Plan multiple JS columns for a table. Returns list of UIDs.
         specs: (title, ctx_info_dict) tuples.
@@ -1183,13 +1849,13 @@ class NB:
 
     def find_click_field(self, tbl_uid: str, field_name: str = "name") -> Optional[str]:
         """Find the DisplayFieldModel UID of a click-to-open column."""
-        items = self._get_json("api/flowModels:list?paginate=false") or []
-        for it in items:
-            if it.get("parentId") == tbl_uid and it.get("use") == "TableColumnModel":
+        by_parent = self._models_by_parent()
+        for it in by_parent.get(tbl_uid, ()):
+            if it.get("use") == "TableColumnModel":
                 fp = it.get("stepParams", {}).get("fieldSettings", {}).get("init", {}).get("fieldPath")
                 if fp == field_name:
-                    for ch in items:
-                        if ch.get("parentId") == it["uid"] and "Display" in (ch.get("use") or ""):
+                    for ch in by_parent.get(it["uid"], ()):
+                        if "Display" in (ch.get("use") or ""):
                             return ch["uid"]
         return None
 
@@ -1243,6 +1909,7 @@ class NB:
         r = self._post(f"api/aiEmployees:destroy?filterByTk={username}")
         return r.ok
 
+    @_batched
     def ai_shortcut_list(self, page_schema_uid: str, employees: list) -> str:
         """Create floating avatar shortcuts on a page.
 
@@ -1393,6 +2060,7 @@ class NB:
     # ── Summary ────────────────────────────────────────────────
 
     def summary(self) -> dict:
+        self.flush()
         return {"created": self.created, "errors": self.errors[:10]}
 
 
@@ -1405,12 +2073,23 @@ def get_nb_client() -> NB:
     )
 
 
+_stdlib_clients = {}
+_stdlib_clients_lock = threading.Lock()
+
+
 def get_stdlib_client() -> NocoBaseClient:
-    """Get a configured NocoBaseClient (stdlib) from environment variables."""
-    client = NocoBaseClient(
-        base_url=os.environ.get("NB_URL", "http://localhost:14000"),
-        user=os.environ.get("NB_USER", "admin@nocobase.com"),
-        password=os.environ.get("NB_PASSWORD", "admin123"),
-    )
-    client.login()
+    """Get a configured NocoBaseClient (stdlib) from environment variables.
+
+    One client per (url, user, password) is kept for the life of the process,
+    so repeated tool calls reuse its token and keep-alive connections.
+    """
+    key = (os.environ.get("NB_URL", "http://localhost:14000"),
+           os.environ.get("NB_USER", "admin@nocobase.com"),
+           os.environ.get("NB_PASSWORD", "admin123"))
+    with _stdlib_clients_lock:
+        client = _stdlib_clients.get(key)
+        if client is None:
+            client = NocoBaseClient(base_url=key[0], user=key[1], password=key[2])
+            client.login()
+            _stdlib_clients[key] = client
     return client
@@ -4,13 +4,12 @@ Tools for managing AI employees (chatbot assistants) and embedding them
 in NocoBase pages as floating avatars and action bar buttons.
 """
 
-import json
 from typing import Optional
 
 from mcp.server.fastmcp import FastMCP
 
 from ..client import get_nb_client
-from ..utils import safe_json
+from ..utils import safe_json, to_json
 
 
 def register_tools(mcp: FastMCP):
@@ -62,7 +61,7 @@ def register_tools(mcp: FastMCP):
             username, nickname, position, avatar, bio,
             about, greeting, skills, model_settings,
         )
-        return json.dumps({"username": result})
+        return to_json({"username": result})
 
     @mcp.tool()
     def nb_list_ai_employees() -> str:
@@ -83,7 +82,7 @@ def register_tools(mcp: FastMCP):
             }
             for e in employees
         ]
-        return json.dumps(summary, ensure_ascii=False)
+        return to_json(summary)
 
     @mcp.tool()
     def nb_get_ai_employee(username: str) -> str:
@@ -97,7 +96,7 @@ def register_tools(mcp: FastMCP):
         """
         nb = get_nb_client()
         emp = nb.ai_employee_get(username)
-        return json.dumps(emp, ensure_ascii=False)
+        return to_json(emp)
 
     @mcp.tool()
     def nb_update_ai_employee(username: str, values_json: str) -> str:
@@ -163,7 +162,7 @@ def register_tools(mcp: FastMCP):
         nb = get_nb_client()
         employees = safe_json(employees_json)
         container_uid = nb.ai_shortcut_list(page_schema_uid, employees)
-        return json.dumps({"container_uid": container_uid})
+        return to_json({"container_uid": container_uid})
 
     @mcp.tool()
     def nb_ai_button(
@@ -192,4 +191,4 @@ def register_tools(mcp: FastMCP):
         nb = get_nb_client()
         tasks = safe_json(tasks_json) if tasks_json else None
         button_uid = nb.ai_button(block_uid, username, tasks)
-        return json.dumps({"button_uid": button_uid})
+        return to_json({"button_uid": button_uid})
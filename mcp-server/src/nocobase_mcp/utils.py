@@ -4,10 +4,29 @@ import json
 import random
 import string
 
+try:
+    import orjson  # optional: faster encoding of tool results
+except ImportError:
+    orjson = None
+
+
+_UID_CHARS = string.ascii_lowercase + string.digits
+_UID_LEN = 11
+_UID_BATCH = 256
+_uid_pool = []
+
 
 def uid() -> str:
-    """Generate an 11-char random lowercase alphanumeric UID (NocoBase FlowModel format)."""
-    return ''.join(random.choices(string.ascii_lowercase + string.digits, k=11))
+    """Generate an 11-char random lowercase alphanumeric UID (NocoBase FlowModel format).
+
+    UIDs are drawn _UID_BATCH at a time from a single random.choices call.
+    """
+    try:
+        return _uid_pool.pop()
+    except IndexError:
+        raw = ''.join(random.choices(_UID_CHARS, k=_UID_LEN * _UID_BATCH))
+        _uid_pool.extend(raw[i:i + _UID_LEN] for i in range(0, len(raw), _UID_LEN))
+        return _uid_pool.pop()
 
 
 def safe_json(val):
@@ -25,6 +44,20 @@ def safe_json(val):
     return val
 
 
+def to_json(obj) -> str:
+    """Serialize a tool result as JSON text, leaving non-ASCII characters as-is.
+
+    Uses orjson when installed; stdlib json otherwise, or when orjson rejects
+    the value (e.g. integers beyond 64 bits).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False)
+
+
 def deep_merge(base: dict, patch: dict) -> dict:
     """Deep merge patch into base dict (in-place). Returns base for chaining."""
     for k, v in patch.items():